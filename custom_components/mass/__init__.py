@@ -3,32 +3,50 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
-from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_URL, EVENT_HOMEASSISTANT_STOP, Platform
-from homeassistant.core import Event, HomeAssistant
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import issue_registry as ir
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.issue_registry import (
-    IssueSeverity,
-    async_create_issue,
-    async_delete_issue,
-)
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.issue_registry import IssueSeverity, async_create_issue
 from homeassistant.helpers.typing import ConfigType
-from music_assistant_client import MusicAssistantClient
 from music_assistant_client.exceptions import CannotConnect, InvalidServerVersion
 from music_assistant_models.enums import EventType
 from music_assistant_models.errors import MusicAssistantError
 
 from .actions import register_actions
-from .const import DOMAIN, LOGGER
+from .commands import PlayerCommandChannel
+from .connection import MusicAssistantConnection
+from .const import (
+    BULK_COMMAND_CONCURRENCY,
+    CONF_LIBRARY_INDEX,
+    DOMAIN,
+    LOGGER,
+    SIGNAL_CONNECTION_STATE,
+)
+from .entity import StateWriteStats
+from .helpers import PlayerEntityIndex, async_remove_player_device
+from .library_index import LibraryIndex, async_remove_library_index
+from .media_cache import (
+    LocalFileCache,
+    MediaNameCache,
+    MediaSourceCache,
+    SearchCache,
+)
+from .metrics import CommandMetrics, SetupTimings
+from .queue_media import QueueMediaAttributesCache
+from .queue_router import QueueEventRouter
+from .storage import StateSnapshotStore, async_remove_state_snapshot
 
 if TYPE_CHECKING:
+    from music_assistant_client import MusicAssistantClient
     from music_assistant_models.event import MassEvent
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
@@ -42,8 +60,32 @@ LISTEN_READY_TIMEOUT = 30
 class MusicAssistantEntryData:
     """Hold Mass data for the config entry."""
 
-    mass: MusicAssistantClient
+    connection: MusicAssistantConnection
     listen_task: asyncio.Task
+    queue_router: QueueEventRouter
+    player_entity_index: PlayerEntityIndex
+    queue_media_cache: QueueMediaAttributesCache
+    snapshot_store: StateSnapshotStore
+    setup_timings: SetupTimings
+    media_name_cache: MediaNameCache
+    local_file_cache: LocalFileCache
+    media_source_cache: MediaSourceCache
+    search_cache: SearchCache
+    state_write_stats: dict[str, StateWriteStats] = field(default_factory=dict)
+    command_metrics: CommandMetrics = field(default_factory=CommandMetrics)
+    command_channels: dict[str, PlayerCommandChannel] = field(default_factory=dict)
+    queue_command_channels: dict[str, PlayerCommandChannel] = field(
+        default_factory=dict
+    )
+    bulk_command_semaphore: asyncio.Semaphore = field(
+        default_factory=lambda: asyncio.Semaphore(BULK_COMMAND_CONCURRENCY)
+    )
+    library_index: LibraryIndex | None = None
+
+    @property
+    def mass(self) -> MusicAssistantClient:
+        """Return the current client."""
+        return self.connection.client
 
 
 type MusicAssistantConfigEntry = ConfigEntry[MusicAssistantEntryData]
@@ -60,9 +102,11 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: MusicAssistantConfigEntry
 ) -> bool:
     """Set up Music Assistant from a config entry."""
+    setup_timings = SetupTimings()
     http_session = async_get_clientsession(hass, verify_ssl=False)
     mass_url = entry.data[CONF_URL]
-    mass = MusicAssistantClient(mass_url, http_session)
+    connection = MusicAssistantConnection(hass, entry.entry_id, mass_url, http_session)
+    mass = connection.client
     async_create_issue(
         hass,
         DOMAIN,
@@ -79,105 +123,156 @@ async def async_setup_entry(
             "integration_title": "mass",
         },
     )
-    try:
-        async with asyncio.timeout(CONNECT_TIMEOUT):
-            await mass.connect()
-    except (TimeoutError, CannotConnect) as err:
-        raise ConfigEntryNotReady(
-            f"Failed to connect to music assistant server {mass_url}"
-        ) from err
-    except InvalidServerVersion as err:
-        async_create_issue(
-            hass,
-            DOMAIN,
-            "invalid_server_version",
-            is_fixable=False,
-            severity=IssueSeverity.ERROR,
-            translation_key="invalid_server_version",
-        )
-        raise ConfigEntryNotReady(f"Invalid server version: {err}") from err
-    except MusicAssistantError as err:
-        LOGGER.exception("Failed to connect to music assistant server", exc_info=err)
-        raise ConfigEntryNotReady(
-            f"Unknown error connecting to the Music Assistant server {mass_url}"
-        ) from err
-
-    async_delete_issue(hass, DOMAIN, "invalid_server_version")
+    # when we have a snapshot of the last known players, the entities are
+    # created (unavailable) from it right away and the client connects and
+    # syncs in the background
+    snapshot_store = StateSnapshotStore(hass, entry.entry_id, connection)
+    with setup_timings.measure("restore_snapshot"):
+        warm_start = await snapshot_store.async_restore()
+
+    if not warm_start:
+        # the server (version) is checked before the setup succeeds
+        try:
+            async with asyncio.timeout(CONNECT_TIMEOUT):
+                with setup_timings.measure("connect"):
+                    await mass.connect()
+        except (TimeoutError, CannotConnect) as err:
+            raise ConfigEntryNotReady(
+                f"Failed to connect to music assistant server {mass_url}"
+            ) from err
+        except InvalidServerVersion as err:
+            async_create_issue(
+                hass,
+                DOMAIN,
+                "invalid_server_version",
+                is_fixable=False,
+                severity=IssueSeverity.ERROR,
+                translation_key="invalid_server_version",
+            )
+            raise ConfigEntryNotReady(f"Invalid server version: {err}") from err
+        except MusicAssistantError as err:
+            LOGGER.exception(
+                "Failed to connect to music assistant server", exc_info=err
+            )
+            raise ConfigEntryNotReady(
+                f"Unknown error connecting to the Music Assistant server {mass_url}"
+            ) from err
 
     async def on_hass_stop(event: Event) -> None:
         """Handle incoming stop event from Home Assistant."""
-        await mass.disconnect()
+        await snapshot_store.async_save()
+        await connection.async_disconnect()
 
     entry.async_on_unload(
         hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, on_hass_stop)
     )
 
     # launch the music assistant client listen task in the background
-    # use the init_ready event to wait until initialization is done
-    init_ready = asyncio.Event()
-    listen_task = asyncio.create_task(_client_listen(hass, entry, mass, init_ready))
+    # and wait until the initial sync is done (unless we have a warm start,
+    # then an unreachable server or incompatible server version is handled
+    # by the connection instead of failing the setup)
+    listen_task = asyncio.create_task(
+        connection.async_listen(raise_on_error=not warm_start)
+    )
 
-    try:
-        async with asyncio.timeout(LISTEN_READY_TIMEOUT):
-            await init_ready.wait()
-    except TimeoutError as err:
-        listen_task.cancel()
-        raise ConfigEntryNotReady("Music Assistant client not ready") from err
+    if not warm_start:
+        try:
+            async with asyncio.timeout(LISTEN_READY_TIMEOUT):
+                await _async_measure_initial_sync(connection, setup_timings)
+        except TimeoutError as err:
+            listen_task.cancel()
+            raise ConfigEntryNotReady("Music Assistant client not ready") from err
+    else:
+        entry.async_create_background_task(
+            hass,
+            _async_measure_initial_sync(connection, setup_timings),
+            "mass_measure_initial_sync",
+        )
 
     # store the listen task and mass client in the entry data
-    entry.runtime_data = MusicAssistantEntryData(mass, listen_task)
+    queue_router = QueueEventRouter(connection)
+    player_entity_index = PlayerEntityIndex(hass, entry.entry_id)
+    queue_media_cache = QueueMediaAttributesCache(connection)
+    media_name_cache = MediaNameCache(connection)
+    search_cache = SearchCache(hass, connection)
+    entry.runtime_data = MusicAssistantEntryData(
+        connection,
+        listen_task,
+        queue_router,
+        player_entity_index,
+        queue_media_cache,
+        snapshot_store,
+        setup_timings,
+        media_name_cache,
+        LocalFileCache(hass),
+        MediaSourceCache(),
+        search_cache,
+    )
+    entry.async_on_unload(queue_router.async_start())
+    entry.async_on_unload(player_entity_index.async_setup())
+    entry.async_on_unload(queue_media_cache.async_start())
+    entry.async_on_unload(snapshot_store.async_setup())
+    entry.async_on_unload(media_name_cache.async_start())
+    entry.async_on_unload(search_cache.async_start())
+    if entry.data.get(CONF_LIBRARY_INDEX):
+        # optional local index of the library to resolve names without the server
+        library_index = LibraryIndex(hass, entry.entry_id, connection)
+        entry.runtime_data.library_index = library_index
+        entry.async_on_unload(library_index.async_start())
 
     # If the listen task is already failed, we need to raise ConfigEntryNotReady
     if listen_task.done() and (listen_error := listen_task.exception()) is not None:
         await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
         try:
-            await mass.disconnect()
+            await connection.async_disconnect()
         finally:
             raise ConfigEntryNotReady(listen_error) from listen_error
 
     # initialize platforms
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    with setup_timings.measure("forward_platforms"):
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     # register listener for removed players
     async def handle_player_removed(event: MassEvent) -> None:
         """Handle Mass Player Removed event."""
         if event.object_id is None:
             return
-        dev_reg = dr.async_get(hass)
-        if hass_device := dev_reg.async_get_device({(DOMAIN, event.object_id)}):
-            dev_reg.async_update_device(
-                hass_device.id, remove_config_entry_id=entry.entry_id
-            )
+        async_remove_player_device(hass, entry.entry_id, event.object_id)
+        # the queue of a player is removed along with it
+        queue_command_channels = entry.runtime_data.queue_command_channels
+        if (channel := queue_command_channels.pop(event.object_id, None)) is not None:
+            channel.shutdown()
 
     entry.async_on_unload(
-        mass.subscribe(handle_player_removed, EventType.PLAYER_REMOVED)
+        connection.subscribe(handle_player_removed, EventType.PLAYER_REMOVED)
+    )
+
+    @callback
+    def handle_connection_state() -> None:
+        """Drop the command channels of the queues removed while disconnected."""
+        queue_command_channels = entry.runtime_data.queue_command_channels
+        for queue_id in list(queue_command_channels):
+            if connection.client.player_queues.get(queue_id) is None:
+                queue_command_channels.pop(queue_id).shutdown()
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_CONNECTION_STATE.format(entry.entry_id),
+            handle_connection_state,
+        )
     )
 
     return True
 
 
-async def _client_listen(
-    hass: HomeAssistant,
-    entry: ConfigEntry,
-    mass: MusicAssistantClient,
-    init_ready: asyncio.Event,
+async def _async_measure_initial_sync(
+    connection: MusicAssistantConnection, setup_timings: SetupTimings
 ) -> None:
-    """Listen with the client."""
-    try:
-        await mass.start_listening(init_ready)
-    except MusicAssistantError as err:
-        if entry.state != ConfigEntryState.LOADED:
-            raise
-        LOGGER.error("Failed to listen: %s", err)
-    except Exception as err:  # pylint: disable=broad-except
-        # We need to guard against unknown exceptions to not crash this task.
-        if entry.state != ConfigEntryState.LOADED:
-            raise
-        LOGGER.exception("Unexpected exception: %s", err)
-
-    if not hass.is_stopping:
-        LOGGER.debug("Disconnected from server. Reloading integration")
-        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+    """Wait for the initial sync of the client and record its timing and counts."""
+    with setup_timings.measure("initial_sync"):
+        await connection.synced.wait()
+    setup_timings.record_initial_state(connection.client)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -187,12 +282,26 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok:
         mass_entry_data: MusicAssistantEntryData = entry.runtime_data
         mass_entry_data.listen_task.cancel()
-        await mass_entry_data.mass.disconnect()
+        # the workers are background tasks of the entry, stop them right away
+        for channel in (
+            *mass_entry_data.command_channels.values(),
+            *mass_entry_data.queue_command_channels.values(),
+        ):
+            channel.shutdown()
+        mass_entry_data.command_channels.clear()
+        mass_entry_data.queue_command_channels.clear()
+        await mass_entry_data.connection.async_disconnect()
         ir.async_delete_issue(hass, DOMAIN, f"move_integration_to_ha_core{DOMAIN}")
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored data when the config entry is removed."""
+    await async_remove_state_snapshot(hass, entry.entry_id)
+    await async_remove_library_index(hass, entry.entry_id)
+
+
 async def async_remove_config_entry_device(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -2,7 +2,13 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, cast
+import asyncio
+import base64
+import binascii
+import dataclasses
+import hashlib
+import json
+from typing import TYPE_CHECKING, Any, cast
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
@@ -15,18 +21,29 @@ from homeassistant.core import (
     callback,
 )
 from homeassistant.exceptions import HomeAssistantError
-from music_assistant_client.helpers import searchresults_as_compact_dict
+from music_assistant_client.exceptions import MusicAssistantClientException
+from music_assistant_client.helpers import (
+    get_serializable_value,
+    searchresults_as_compact_dict,
+)
 from music_assistant_models.enums import MediaType
+from music_assistant_models.errors import MusicAssistantError
 
 from .const import DOMAIN
 
 if TYPE_CHECKING:
     from music_assistant_client import MusicAssistantClient
+    from music_assistant_models.media_items import (
+        ItemMapping,
+        MediaItemType,
+        SearchResults,
+    )
 
-    from . import MusicAssistantConfigEntry
+    from . import MusicAssistantConfigEntry, MusicAssistantEntryData
 
 SERVICE_SEARCH = "search"
 SERVICE_GET_LIBRARY = "get_library"
+SERVICE_SEARCH_MANY = "search_many"
 ATTR_MEDIA_TYPE = "media_type"
 ATTR_SEARCH_NAME = "name"
 ATTR_SEARCH_ARTIST = "artist"
@@ -39,49 +56,159 @@ ATTR_OFFSET = "offset"
 ATTR_ORDER_BY = "order_by"
 ATTR_ALBUM_TYPE = "album_type"
 ATTR_ALBUM_ARTISTS_ONLY = "album_artists_only"
+ATTR_CURSOR = "cursor"
+ATTR_FETCH_ALL = "fetch_all"
+ATTR_NEXT_CURSOR = "next_cursor"
+ATTR_FIELDS = "fields"
+ATTR_QUERIES = "queries"
+
+# maximum number of queries of a search_many action
+SEARCH_MANY_MAX_QUERIES = 500
+# number of searches of a search_many action sent to the server concurrently
+SEARCH_MANY_CONCURRENCY = 8
+# seconds a single search of a search_many action may take
+SEARCH_MANY_QUERY_TIMEOUT = 30
+
+# (virtual) field with the names of the artists of a media item
+FIELD_ARTIST = "artist"
+FIELD_ALBUM = "album"
+FIELD_IMAGE = "image"
+# requestable fields per media item type
+_MEDIA_ITEM_FIELDS: dict[type, frozenset[str]] = {}
+
+# maximum number of library items requested from the server at once
+LIBRARY_PAGE_SIZE = 500
+# number of library pages requested concurrently in fetch_all mode
+LIBRARY_FETCH_CONCURRENCY = 4
+# maximum number of library items returned in fetch_all mode
+LIBRARY_FETCH_ALL_MAX_ITEMS = 10000
+CURSOR_OFFSET_EXCLUSIVE_MSG = f"{ATTR_CURSOR} can not be combined with {ATTR_OFFSET}"
 
 
 @callback
-def get_music_assistant_client(hass: HomeAssistant) -> MusicAssistantClient:
-    """Get the (first) Music Assistant client from the (loaded) config entries."""
+def get_music_assistant_entry_data(hass: HomeAssistant) -> MusicAssistantEntryData:
+    """Get the data of the (first) loaded Music Assistant config entry."""
     entry: MusicAssistantConfigEntry
     for entry in hass.config_entries.async_entries(DOMAIN, False, False):
         if entry.state != ConfigEntryState.LOADED:
             continue
-        return entry.runtime_data.mass
+        return entry.runtime_data
     raise HomeAssistantError("Music Assistant is not loaded")
 
 
+@callback
+def get_music_assistant_client(hass: HomeAssistant) -> MusicAssistantClient:
+    """Get the (first) Music Assistant client from the (loaded) config entries."""
+    return get_music_assistant_entry_data(hass).mass
+
+
+def _media_item_fields(item: MediaItemType | ItemMapping) -> frozenset[str]:
+    """Return the fields that can be requested for (the type of) a media item."""
+    if (allowed_fields := _MEDIA_ITEM_FIELDS.get(type(item))) is None:
+        allowed_fields = _MEDIA_ITEM_FIELDS[type(item)] = frozenset(
+            {field.name for field in dataclasses.fields(item)}
+            | {FIELD_ARTIST, FIELD_IMAGE}
+        )
+    return allowed_fields
+
+
+def project_media_item(
+    mass: MusicAssistantClient, item: MediaItemType | ItemMapping, fields: list[str]
+) -> dict[str, Any]:
+    """Return (only) the requested fields of a media item as serializable dict.
+
+    Only the requested attributes are serialized, the full dict of the item
+    is never built. Fields the item does not have are None, the album is
+    returned as its name and the image as its url.
+    """
+    allowed_fields = _media_item_fields(item)
+    result: dict[str, Any] = {}
+    for key in fields:
+        if key not in allowed_fields:
+            result[key] = None
+        elif key == FIELD_ARTIST:
+            artists = getattr(item, "artists", None) or ()
+            result[key] = ", ".join(artist.name for artist in artists) or None
+        elif key == FIELD_ALBUM:
+            album = getattr(item, "album", None)
+            result[key] = album.name if album else None
+        elif key == FIELD_IMAGE:
+            result[key] = mass.get_media_item_image_url(item)
+        else:
+            result[key] = get_serializable_value(getattr(item, key))
+    return result
+
+
+def serialize_media_item(
+    mass: MusicAssistantClient,
+    item: MediaItemType | ItemMapping,
+    fields: list[str] | None,
+) -> dict[str, Any]:
+    """Return the (projected) dict of a media item."""
+    if fields:
+        return project_media_item(mass, item, fields)
+    item_dict: dict[str, Any] = item.to_dict()
+    return item_dict
+
+
 @callback
 def register_actions(hass: HomeAssistant) -> None:
     """Register custom actions."""
     register_search_action(hass)
+    register_search_many_action(hass)
     register_get_library_action(hass)
 
 
+def _search_query(data: dict[str, Any]) -> str:
+    """Return the search query for a name and (optional) artist/album."""
+    search_name: str = data[ATTR_SEARCH_NAME]
+    search_artist = data.get(ATTR_SEARCH_ARTIST)
+    search_album = data.get(ATTR_SEARCH_ALBUM)
+    if search_album and search_artist:
+        return f"{search_artist} - {search_album} - {search_name}"
+    if search_album:
+        return f"{search_album} - {search_name}"
+    if search_artist:
+        return f"{search_artist} - {search_name}"
+    return search_name
+
+
+def _search_response(
+    mass: MusicAssistantClient, search_results: SearchResults, fields: list[str] | None
+) -> dict[str, Any]:
+    """Return the (projected) dict of search results."""
+    if fields:
+        return {
+            field.name: [
+                project_media_item(mass, item, fields)
+                for item in getattr(search_results, field.name)
+            ]
+            for field in dataclasses.fields(search_results)
+        }
+    # return limited result to prevent it being too verbose
+    compact_results: dict[str, Any] = searchresults_as_compact_dict(search_results)
+    return compact_results
+
+
 def register_search_action(hass: HomeAssistant) -> None:
     """Register search action."""
 
     async def handle_search(call: ServiceCall) -> ServiceResponse:
         """Handle queue_command action."""
-        mass = get_music_assistant_client(hass)
-        search_name = call.data[ATTR_SEARCH_NAME]
-        search_artist = call.data.get(ATTR_SEARCH_ARTIST)
-        search_album = call.data.get(ATTR_SEARCH_ALBUM)
-        if search_album and search_artist:
-            search_name = f"{search_artist} - {search_album} - {search_name}"
-        elif search_album:
-            search_name = f"{search_album} - {search_name}"
-        elif search_artist:
-            search_name = f"{search_artist} - {search_name}"
-        search_results = await mass.music.search(
-            search_query=search_name,
+        entry_data = get_music_assistant_entry_data(hass)
+        # identical (concurrent) searches are shared and cached for a short time
+        search_results = await entry_data.search_cache.async_search(
+            search_query=_search_query(call.data),
             media_types=call.data.get(ATTR_MEDIA_TYPE, MediaType.ALL),
             limit=call.data[ATTR_LIMIT],
             library_only=call.data[ATTR_LIBRARY_ONLY],
         )
-        # return limited result to prevent it being too verbose
-        return cast(ServiceResponse, searchresults_as_compact_dict(search_results))
+        return cast(
+            ServiceResponse,
+            _search_response(
+                entry_data.mass, search_results, call.data.get(ATTR_FIELDS)
+            ),
+        )
 
     hass.services.async_register(
         DOMAIN,
@@ -97,12 +224,193 @@ def register_search_action(hass: HomeAssistant) -> None:
                 vol.Optional(ATTR_SEARCH_ALBUM): cv.string,
                 vol.Optional(ATTR_LIMIT, default=5): vol.Coerce(int),
                 vol.Optional(ATTR_LIBRARY_ONLY, default=False): cv.boolean,
+                vol.Optional(ATTR_FIELDS): vol.All(cv.ensure_list, [cv.string]),
+            }
+        ),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def register_search_many_action(hass: HomeAssistant) -> None:
+    """Register search_many action."""
+
+    async def handle_search_many(call: ServiceCall) -> ServiceResponse:
+        """Handle search_many action."""
+        entry_data = get_music_assistant_entry_data(hass)
+        fields = call.data.get(ATTR_FIELDS)
+        semaphore = asyncio.Semaphore(SEARCH_MANY_CONCURRENCY)
+
+        async def search(query: dict[str, Any]) -> dict[str, Any]:
+            """Search for a single query, report the result."""
+            async with semaphore:
+                try:
+                    async with asyncio.timeout(SEARCH_MANY_QUERY_TIMEOUT):
+                        search_results = await entry_data.search_cache.async_search(
+                            search_query=_search_query(query),
+                            media_types=query.get(ATTR_MEDIA_TYPE, MediaType.ALL),
+                            limit=call.data[ATTR_LIMIT],
+                            library_only=call.data[ATTR_LIBRARY_ONLY],
+                        )
+                except (
+                    MusicAssistantError,
+                    MusicAssistantClientException,
+                    TimeoutError,
+                ) as err:
+                    # e.g. the server is not connected or the search timed out
+                    return {
+                        "success": False,
+                        "error": str(err) or err.__class__.__name__,
+                    }
+            return {
+                "success": True,
+                **_search_response(entry_data.mass, search_results, fields),
+            }
+
+        # results are returned in the order of the queries
+        results = await asyncio.gather(
+            *(search(query) for query in call.data[ATTR_QUERIES])
+        )
+        return cast(ServiceResponse, {"results": results})
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SEARCH_MANY,
+        handle_search_many,
+        schema=vol.Schema(
+            {
+                vol.Required(ATTR_QUERIES): vol.All(
+                    cv.ensure_list,
+                    vol.Length(min=1, max=SEARCH_MANY_MAX_QUERIES),
+                    [
+                        vol.Schema(
+                            {
+                                vol.Required(ATTR_SEARCH_NAME): cv.string,
+                                vol.Optional(ATTR_MEDIA_TYPE): vol.All(
+                                    cv.ensure_list, [vol.Coerce(MediaType)]
+                                ),
+                                vol.Optional(ATTR_SEARCH_ARTIST): cv.string,
+                                vol.Optional(ATTR_SEARCH_ALBUM): cv.string,
+                            }
+                        )
+                    ],
+                ),
+                vol.Optional(ATTR_LIMIT, default=5): vol.Coerce(int),
+                vol.Optional(ATTR_LIBRARY_ONLY, default=False): cv.boolean,
+                vol.Optional(ATTR_FIELDS): vol.All(cv.ensure_list, [cv.string]),
             }
         ),
         supports_response=SupportsResponse.ONLY,
     )
 
 
+def _library_query_hash(media_type: MediaType, query: dict[str, Any]) -> str:
+    """Return a (short) fingerprint of a library query."""
+    fingerprint = json.dumps([media_type, query], sort_keys=True, default=str)
+    return hashlib.sha1(fingerprint.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def encode_library_cursor(
+    offset: int, media_type: MediaType, query: dict[str, Any]
+) -> str:
+    """Return the (opaque) cursor to continue a library query at an offset."""
+    payload = json.dumps({"o": offset, "q": _library_query_hash(media_type, query)})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_library_cursor(
+    cursor: str, media_type: MediaType, query: dict[str, Any]
+) -> int:
+    """Return the offset of a library cursor, validate it belongs to the query."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        offset = int(payload["o"])
+        query_hash = payload["q"]
+    except (binascii.Error, KeyError, TypeError, ValueError) as err:
+        raise HomeAssistantError("Invalid cursor") from err
+    if offset < 0 or query_hash != _library_query_hash(media_type, query):
+        raise HomeAssistantError("Cursor does not belong to this query")
+    return offset
+
+
+async def _async_get_library_page(
+    mass: MusicAssistantClient,
+    media_type: MediaType,
+    query: dict[str, Any],
+    limit: int,
+    offset: int,
+    fields: list[str] | None = None,
+) -> list[dict[str, Any]]:
+    """Get (and serialize) a page of library items."""
+    base_params = {
+        "favorite": query[ATTR_FAVORITE],
+        "search": query[ATTR_SEARCH],
+        "limit": limit,
+        "offset": offset,
+        "order_by": query[ATTR_ORDER_BY],
+    }
+    if media_type == MediaType.ALBUM:
+        library_result = await mass.music.get_library_albums(
+            **base_params,
+            album_types=query[ATTR_ALBUM_TYPE],
+        )
+    elif media_type == MediaType.ARTIST:
+        library_result = await mass.music.get_library_artists(
+            **base_params,
+            album_artists_only=query[ATTR_ALBUM_ARTISTS_ONLY],
+        )
+    elif media_type == MediaType.TRACK:
+        library_result = await mass.music.get_library_tracks(
+            **base_params,
+        )
+    elif media_type == MediaType.RADIO:
+        library_result = await mass.music.get_library_radios(
+            **base_params,
+        )
+    elif media_type == MediaType.PLAYLIST:
+        library_result = await mass.music.get_library_playlists(
+            **base_params,
+        )
+    else:
+        raise HomeAssistantError(f"Unsupported media type {media_type}")
+    return [serialize_media_item(mass, item, fields) for item in library_result]
+
+
+async def async_fetch_library(
+    mass: MusicAssistantClient,
+    media_type: MediaType,
+    query: dict[str, Any],
+    offset: int,
+    max_items: int,
+    fields: list[str] | None = None,
+) -> tuple[list[dict[str, Any]], bool]:
+    """Page through the library concurrently, return the items and if there are more.
+
+    Every page is serialized as soon as it is received, so the (much larger)
+    media item models of the whole library are never held at once.
+    """
+    items: list[dict[str, Any]] = []
+    while len(items) < max_items:
+        end = offset + max_items
+        pages = [
+            (page_offset, min(LIBRARY_PAGE_SIZE, end - page_offset))
+            for page_offset in range(offset + len(items), end, LIBRARY_PAGE_SIZE)
+        ][:LIBRARY_FETCH_CONCURRENCY]
+        results = await asyncio.gather(
+            *(
+                _async_get_library_page(
+                    mass, media_type, query, limit, page_offset, fields
+                )
+                for page_offset, limit in pages
+            )
+        )
+        for (_, limit), page in zip(pages, results, strict=True):
+            items.extend(page)
+            if len(page) < limit:
+                # reached the end of the library
+                return items, False
+    return items, True
+
+
 def register_get_library_action(hass: HomeAssistant) -> None:
     """Register get_library action."""
 
@@ -110,39 +418,45 @@ def register_get_library_action(hass: HomeAssistant) -> None:
         """Handle get_library action."""
         mass = get_music_assistant_client(hass)
         media_type = call.data[ATTR_MEDIA_TYPE]
-        base_params = {
-            "favorite": call.data.get(ATTR_FAVORITE),
-            "search": call.data.get(ATTR_SEARCH),
-            "limit": call.data.get(ATTR_LIMIT),
-            "offset": call.data.get(ATTR_OFFSET),
-            "order_by": call.data.get(ATTR_ORDER_BY),
-        }
-        if media_type == MediaType.ALBUM:
-            library_result = await mass.music.get_library_albums(
-                **base_params,
-                album_types=call.data.get(ATTR_ALBUM_TYPE),
-            )
-        elif media_type == MediaType.ARTIST:
-            library_result = await mass.music.get_library_artists(
-                **base_params,
-                album_artists_only=call.data.get(ATTR_ALBUM_ARTISTS_ONLY),
-            )
-        elif media_type == MediaType.TRACK:
-            library_result = await mass.music.get_library_tracks(
-                **base_params,
+        query = {
+            key: call.data.get(key)
+            for key in (
+                ATTR_FAVORITE,
+                ATTR_SEARCH,
+                ATTR_ORDER_BY,
+                ATTR_ALBUM_TYPE,
+                ATTR_ALBUM_ARTISTS_ONLY,
             )
-        elif media_type == MediaType.RADIO:
-            library_result = await mass.music.get_library_radios(
-                **base_params,
+        }
+        if cursor := call.data.get(ATTR_CURSOR):
+            offset = decode_library_cursor(cursor, media_type, query)
+        else:
+            offset = call.data.get(ATTR_OFFSET) or 0
+        limit = call.data.get(ATTR_LIMIT)
+        fields = call.data.get(ATTR_FIELDS)
+        if call.data[ATTR_FETCH_ALL]:
+            max_items = min(
+                limit or LIBRARY_FETCH_ALL_MAX_ITEMS, LIBRARY_FETCH_ALL_MAX_ITEMS
             )
-        elif media_type == MediaType.PLAYLIST:
-            library_result = await mass.music.get_library_playlists(
-                **base_params,
+            items, has_more = await async_fetch_library(
+                mass, media_type, query, offset, max_items, fields
             )
         else:
-            raise HomeAssistantError(f"Unsupported media type {media_type}")
+            # the page size equals the default limit of the server
+            limit = limit or LIBRARY_PAGE_SIZE
+            items = await _async_get_library_page(
+                mass, media_type, query, limit, offset, fields
+            )
+            has_more = len(items) == limit
         # result must be a dict so we return the media item (+s) as key
-        result = {f"{media_type.value}s": [item.to_dict() for item in library_result]}
+        result = {
+            f"{media_type.value}s": items,
+            ATTR_NEXT_CURSOR: (
+                encode_library_cursor(offset + len(items), media_type, query)
+                if has_more
+                else None
+            ),
+        }
         return cast(ServiceResponse, result)
 
     hass.services.async_register(
@@ -155,10 +469,17 @@ def register_get_library_action(hass: HomeAssistant) -> None:
                 vol.Optional(ATTR_FAVORITE): cv.boolean,
                 vol.Optional(ATTR_SEARCH): cv.string,
                 vol.Optional(ATTR_LIMIT): cv.positive_int,
-                vol.Optional(ATTR_OFFSET): int,
+                vol.Exclusive(
+                    ATTR_OFFSET, "position", msg=CURSOR_OFFSET_EXCLUSIVE_MSG
+                ): int,
                 vol.Optional(ATTR_ORDER_BY): cv.string,
                 vol.Optional(ATTR_ALBUM_TYPE): list[MediaType],
                 vol.Optional(ATTR_ALBUM_ARTISTS_ONLY): cv.boolean,
+                vol.Exclusive(
+                    ATTR_CURSOR, "position", msg=CURSOR_OFFSET_EXCLUSIVE_MSG
+                ): cv.string,
+                vol.Optional(ATTR_FETCH_ALL, default=False): cv.boolean,
+                vol.Optional(ATTR_FIELDS): vol.All(cv.ensure_list, [cv.string]),
             }
         ),
         supports_response=SupportsResponse.ONLY,
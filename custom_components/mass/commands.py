@@ -0,0 +1,116 @@
+"""Ordered command channel to a Music Assistant player."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import HomeAssistant
+
+
+@dataclass(slots=True)
+class _QueuedCommand:
+    """Command waiting to be sent to the player."""
+
+    send: Callable[[], Awaitable[Any]]
+    coalesce_key: str | None
+    waiters: list[asyncio.Future[None]] = field(default_factory=list)
+
+
+class PlayerCommandChannel:
+    """Send the commands to a player (or queue) one at a time, in order.
+
+    Every player and queue has its own channel, so commands to different
+    players are sent in parallel.
+
+    Commands with a coalesce key (e.g. volume and seek) that are queued back
+    to back are collapsed, so only the latest value is sent. The callers of
+    the dropped values wait until the latest value has been applied.
+
+    The commands are sent by a background task of the config entry, so it
+    is cancelled when the entry is unloaded.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, player_id: str) -> None:
+        """Initialize the channel."""
+        self.hass = hass
+        self.entry = entry
+        self.player_id = player_id
+        self._queue: deque[_QueuedCommand] = deque()
+        self._worker: asyncio.Task | None = None
+        self._sending = False
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        """Return the number of commands queued or being sent."""
+        return len(self._queue) + self._sending
+
+    async def async_send(
+        self,
+        send: Callable[[], Awaitable[Any]],
+        coalesce_key: str | None = None,
+    ) -> None:
+        """Queue a command and wait until it (or a newer value) was sent."""
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        if (
+            coalesce_key is not None
+            and self._queue
+            and self._queue[-1].coalesce_key == coalesce_key
+        ):
+            # latest wins: replace the value that has not been sent yet
+            command = self._queue[-1]
+            command.send = send
+        else:
+            command = _QueuedCommand(send, coalesce_key)
+            self._queue.append(command)
+        command.waiters.append(waiter)
+        self.max_depth = max(self.max_depth, self.depth)
+        if self._worker is None:
+            worker = self.entry.async_create_background_task(
+                self.hass, self._async_process(), f"mass_commands_{self.player_id}"
+            )
+            # started eagerly, it may have sent the command(s) already
+            if not worker.done():
+                self._worker = worker
+        await waiter
+
+    def shutdown(self) -> None:
+        """Stop processing and cancel the pending commands."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        while self._queue:
+            for waiter in self._queue.popleft().waiters:
+                waiter.cancel()
+
+    async def _async_process(self) -> None:
+        """Send the queued commands."""
+        try:
+            while self._queue:
+                command = self._queue.popleft()
+                self._sending = True
+                try:
+                    await command.send()
+                except Exception as err:  # pylint: disable=broad-except
+                    # the exception is raised to the caller(s) of the command
+                    for waiter in command.waiters:
+                        if not waiter.done():
+                            waiter.set_exception(err)
+                else:
+                    for waiter in command.waiters:
+                        if not waiter.done():
+                            waiter.set_result(None)
+                finally:
+                    self._sending = False
+                    # processing was cancelled (shutdown)
+                    for waiter in command.waiters:
+                        if not waiter.done():
+                            waiter.cancel()
+        finally:
+            self._worker = None
@@ -16,7 +16,15 @@ from music_assistant_client import MusicAssistantClient
 from music_assistant_client.exceptions import CannotConnect, InvalidServerVersion
 from music_assistant_models.api import ServerInfoMessage
 
-from .const import CONF_ASSIST_AUTO_EXPOSE_PLAYERS, CONF_OPENAI_AGENT_ID, DOMAIN, LOGGER
+from .const import (
+    CONF_ASSIST_AUTO_EXPOSE_PLAYERS,
+    CONF_LIBRARY_INDEX,
+    CONF_OPENAI_AGENT_ID,
+    CONF_STATE_UPDATE_WINDOW,
+    DEFAULT_STATE_UPDATE_WINDOW,
+    DOMAIN,
+    LOGGER,
+)
 
 DEFAULT_URL = "http://mass.local:8095"
 DEFAULT_TITLE = "Music Assistant"
@@ -212,6 +220,28 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     )
                 },
             ): bool,
+            vol.Optional(
+                CONF_STATE_UPDATE_WINDOW,
+                description={
+                    "suggested_value": config_entry.data.get(
+                        CONF_STATE_UPDATE_WINDOW, DEFAULT_STATE_UPDATE_WINDOW
+                    )
+                },
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=1000,
+                    step=10,
+                    unit_of_measurement="ms",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_LIBRARY_INDEX,
+                description={
+                    "suggested_value": config_entry.data.get(CONF_LIBRARY_INDEX)
+                },
+            ): bool,
         }
 
 
@@ -0,0 +1,193 @@
+"""Supervise the connection to the Music Assistant server."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from functools import partial
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.issue_registry import (
+    IssueSeverity,
+    async_create_issue,
+    async_delete_issue,
+)
+from music_assistant_client import MusicAssistantClient
+from music_assistant_client.exceptions import (
+    InvalidServerVersion,
+    MusicAssistantClientException,
+)
+from music_assistant_models.enums import EventType
+from music_assistant_models.errors import MusicAssistantError
+
+from .const import DOMAIN, LOGGER, SIGNAL_CONNECTION_STATE
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+    from music_assistant_client.client import EventCallBackType
+    from music_assistant_models.event import MassEvent
+
+RECONNECT_BACKOFF_MIN = 1
+RECONNECT_BACKOFF_MAX = 300
+
+type EventSubscription = tuple[
+    EventCallBackType, tuple[EventType, ...] | None, tuple[str, ...] | None
+]
+
+
+class MusicAssistantConnection:
+    """Hold the current client and reconnect with a fresh one when it drops.
+
+    A (dis)connected client can not be reused, so every reconnect attempt
+    gets a new client. It replaces the current client once its initial
+    state is synced, until then the entities keep rendering the (now
+    unavailable) last known state of the previous client.
+
+    Subscriptions are made on the connection instead of the client,
+    so they carry over to the next client.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        server_url: str,
+        http_session: ClientSession,
+    ) -> None:
+        """Initialize the connection."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self.server_url = server_url
+        self._http_session = http_session
+        self.client = MusicAssistantClient(server_url, http_session)
+        # set once a client completed its initial sync
+        self.synced = asyncio.Event()
+        self._subscribers: list[EventSubscription] = []
+        self._pending_client: MusicAssistantClient | None = None
+
+    @callback
+    def subscribe(
+        self,
+        cb_func: EventCallBackType,
+        event_filter: EventType | tuple[EventType, ...] | None = None,
+        id_filter: str | tuple[str, ...] | None = None,
+    ) -> Callable[[], None]:
+        """Subscribe to the events of the current client, return unsubscribe function."""
+        if isinstance(event_filter, EventType):
+            event_filter = (event_filter,)
+        if isinstance(id_filter, str):
+            id_filter = (id_filter,)
+        subscription: EventSubscription = (cb_func, event_filter, id_filter)
+        self._subscribers.append(subscription)
+
+        @callback
+        def remove_listener() -> None:
+            self._subscribers.remove(subscription)
+
+        return remove_listener
+
+    async def async_listen(self, raise_on_error: bool = True) -> None:
+        """Listen to the server until cancelled, reconnect when the connection drops.
+
+        Errors before the first sync are raised if raise_on_error is set,
+        so the setup can fail. An incompatible server stops reconnecting.
+        """
+        signal = SIGNAL_CONNECTION_STATE.format(self.entry_id)
+        backoff = RECONNECT_BACKOFF_MIN
+        failed_attempts = 0
+        client = self.client
+        while True:
+            init_ready = asyncio.Event()
+            self._pending_client = client
+            unsub = client.subscribe(partial(self._relay_event, client))
+            activate_task = self.hass.async_create_background_task(
+                self._async_activate_when_ready(client, init_ready),
+                "mass_activate_client",
+            )
+            try:
+                await client.start_listening(init_ready)
+            except InvalidServerVersion as err:
+                if raise_on_error and not self.synced.is_set():
+                    raise
+                async_create_issue(
+                    self.hass,
+                    DOMAIN,
+                    "invalid_server_version",
+                    is_fixable=False,
+                    severity=IssueSeverity.ERROR,
+                    translation_key="invalid_server_version",
+                )
+                LOGGER.error("Stopped reconnecting to Music Assistant server: %s", err)
+                return
+            except (MusicAssistantError, MusicAssistantClientException) as err:
+                if raise_on_error and not self.synced.is_set():
+                    raise
+                log = LOGGER.warning if failed_attempts == 0 else LOGGER.debug
+                log("Unable to connect to Music Assistant server: %s", err)
+            except Exception:  # pylint: disable=broad-except
+                # We need to guard against unknown exceptions to not crash this task.
+                if raise_on_error and not self.synced.is_set():
+                    raise
+                if failed_attempts == 0:
+                    LOGGER.exception("Unexpected exception")
+                else:
+                    LOGGER.debug("Unexpected exception", exc_info=True)
+            finally:
+                unsub()
+                activate_task.cancel()
+                self._pending_client = None
+
+            if self.hass.is_stopping:
+                return
+            if init_ready.is_set():
+                # we lost an established connection, mark all entities unavailable
+                LOGGER.warning("Disconnected from Music Assistant server, reconnecting")
+                async_dispatcher_send(self.hass, signal)
+                backoff = RECONNECT_BACKOFF_MIN
+                failed_attempts = 0
+            else:
+                failed_attempts += 1
+            LOGGER.debug(
+                "Reconnecting to Music Assistant server in %s seconds", backoff
+            )
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+            client = MusicAssistantClient(self.server_url, self._http_session)
+
+    async def async_disconnect(self) -> None:
+        """Disconnect the current (and a connecting) client."""
+        if self._pending_client is not None and self._pending_client is not self.client:
+            await self._pending_client.disconnect()
+        await self.client.disconnect()
+
+    async def _async_activate_when_ready(
+        self, client: MusicAssistantClient, init_ready: asyncio.Event
+    ) -> None:
+        """Make a client the current one once its initial sync is done."""
+        await init_ready.wait()
+        reconnected = client is not self.client
+        self.client = client
+        self.synced.set()
+        async_delete_issue(self.hass, DOMAIN, "invalid_server_version")
+        if reconnected:
+            LOGGER.info("Reconnected to Music Assistant server")
+        # let the entities pick up the (re)fetched players and queues
+        async_dispatcher_send(self.hass, SIGNAL_CONNECTION_STATE.format(self.entry_id))
+
+    @callback
+    def _relay_event(self, client: MusicAssistantClient, event: MassEvent) -> None:
+        """Forward an event of the current client to the subscribers."""
+        if client is not self.client:
+            # events of a client that is still syncing (or was replaced)
+            return
+        for cb_func, event_filter, id_filter in list(self._subscribers):
+            if event_filter is not None and event.event not in event_filter:
+                continue
+            if id_filter is not None and event.object_id not in id_filter:
+                continue
+            if asyncio.iscoroutinefunction(cb_func):
+                self.hass.async_create_task(cb_func(event), eager_start=False)
+            else:
+                cb_func(event)
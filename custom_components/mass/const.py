@@ -25,7 +25,19 @@ ATTR_STREAM_TITLE = "stream_title"
 CONF_OPENAI_AGENT_ID = "openai_agent_id"
 CONF_ASSIST_AUTO_EXPOSE_PLAYERS = "expose_players_assist"
 CONF_PRE_ANNOUNCE_TTS = "pre_announce_tts"
+CONF_STATE_UPDATE_WINDOW = "state_update_window"
+CONF_LIBRARY_INDEX = "library_index"
+
+# window (in milliseconds) in which updates of an entity are coalesced into
+# a single state write, e.g. a track change sends multiple events at once
+DEFAULT_STATE_UPDATE_WINDOW = 50
 
 SERVICE_PLAY_MEDIA_ADVANCED = "play_media"
 
+# max number of players a bulk_player_command action sends a command to at once
+BULK_COMMAND_CONCURRENCY = 8
+
+# dispatched (with the config entry id) when the server connection is lost/restored
+SIGNAL_CONNECTION_STATE = f"{DOMAIN}_connection_state_{{}}"
+
 LOGGER = logging.getLogger(__package__)
@@ -0,0 +1,71 @@
+"""Diagnostics support for Music Assistant."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_URL, STATE_UNAVAILABLE
+from homeassistant.helpers import entity_registry as er
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from . import MusicAssistantConfigEntry
+
+TO_REDACT = {CONF_URL}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: MusicAssistantConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = entry.runtime_data
+    mass = entry_data.mass
+    entities = er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+    unavailable = sum(
+        1
+        for entity in entities
+        if (state := hass.states.get(entity.entity_id)) is None
+        or state.state == STATE_UNAVAILABLE
+    )
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "server": {
+            "connected": mass.connection.connected,
+            "version": mass.server_info.server_version if mass.server_info else None,
+            "schema_version": (
+                mass.server_info.schema_version if mass.server_info else None
+            ),
+        },
+        "setup": entry_data.setup_timings.as_dict(),
+        "entities": {
+            "total": len(entities),
+            "disabled": sum(1 for entity in entities if entity.disabled),
+            "unavailable": unavailable,
+            "players": len(list(mass.players)),
+            "queues": len(list(mass.player_queues)),
+        },
+        "state_writes": {
+            player_id: asdict(stats)
+            for player_id, stats in entry_data.state_write_stats.items()
+        },
+        "commands": entry_data.command_metrics.as_dict(),
+        "name_cache": entry_data.media_name_cache.as_dict(),
+        "search_cache": entry_data.search_cache.as_dict(),
+        "library_index": (
+            entry_data.library_index.as_dict() if entry_data.library_index else None
+        ),
+        "command_queues": {
+            player_id: {"depth": channel.depth, "max_depth": channel.max_depth}
+            for player_id, channel in entry_data.command_channels.items()
+        },
+        "queue_command_queues": {
+            queue_id: {"depth": channel.depth, "max_depth": channel.max_depth}
+            for queue_id, channel in entry_data.queue_command_channels.items()
+        },
+    }
@@ -2,18 +2,44 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, cast
 
+from homeassistant.core import callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo, Entity
 from music_assistant_models.enums import EventType
 from music_assistant_models.event import MassEvent
 
-from .const import DOMAIN
+from .const import (
+    CONF_STATE_UPDATE_WINDOW,
+    DEFAULT_STATE_UPDATE_WINDOW,
+    DOMAIN,
+    LOGGER,
+    SIGNAL_CONNECTION_STATE,
+)
 
 if TYPE_CHECKING:
     from music_assistant_client import MusicAssistantClient
     from music_assistant_models.player import Player
 
+    from . import MusicAssistantEntryData
+    from .connection import MusicAssistantConnection
+
+# seconds after a command in which the next update is written right away
+FLUSH_NEXT_UPDATE_TIMEOUT = 2
+
+
+@dataclass(slots=True)
+class StateWriteStats:
+    """Count the state writes of an entity."""
+
+    written: int = 0
+    suppressed: int = 0
+
 
 class MusicAssistantBaseEntity(Entity):
     """Base Entity from Music Assistant Player."""
@@ -21,18 +47,29 @@ class MusicAssistantBaseEntity(Entity):
     _attr_has_entity_name = True
     _attr_should_poll = False
 
-    def __init__(self, mass: MusicAssistantClient, player_id: str) -> None:
-        """Initialize MediaPlayer entity."""
-        self.mass = mass
+    def __init__(
+        self,
+        connection: MusicAssistantConnection,
+        player_id: str,
+        restored_player: Player | None = None,
+    ) -> None:
+        """Initialize MediaPlayer entity.
+
+        The restored player (of the state snapshot) is rendered, as
+        unavailable, until the client has synced the live player.
+        """
+        self.connection = connection
         self.player_id = player_id
-        player = mass.players.get(player_id)
+        self._restored_player = restored_player
+        mass = connection.client
+        player = self.player
+        # providers are only known after the initial sync
         provider = self.mass.get_provider(player.provider, True)
-        if TYPE_CHECKING:
-            assert provider is not None
 
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, player_id)},
-            manufacturer=self.player.device_info.manufacturer or provider.name,
+            manufacturer=self.player.device_info.manufacturer
+            or (provider.name if provider else player.provider),
             model=self.player.device_info.model or self.player.name,
             name=self.player.display_name,
             configuration_url=f"{mass.server_url}/#/settings/editplayer/{player_id}",
@@ -43,26 +80,71 @@ class MusicAssistantBaseEntity(Entity):
             self._attr_device_info["connections"] = {
                 ("mac", self.player.device_info.mac_address),
             }
+        self._queue_ids: set[str] = set()
+        self._active_source: str | None = None
+        self._unsub_queue_updates: list[Callable[[], None]] = []
+        self._update_debouncer: Debouncer | None = None
+        self._flush_next_update_until = 0.0
+        self._state_snapshot: Any = None
+        self._write_stats = StateWriteStats()
 
     async def async_added_to_hass(self) -> None:
         """Register callbacks."""
+        if TYPE_CHECKING:
+            assert self.platform.config_entry is not None
+        update_window = self.platform.config_entry.data.get(
+            CONF_STATE_UPDATE_WINDOW, DEFAULT_STATE_UPDATE_WINDOW
+        )
+        # coalesce updates arriving within the window into a single state write
+        self._update_debouncer = Debouncer(
+            self.hass,
+            LOGGER,
+            cooldown=update_window / 1000,
+            immediate=False,
+            function=self._async_update_and_write,
+        )
+        self.async_on_remove(self._update_debouncer.async_shutdown)
+        self._write_stats = self.entry_data.state_write_stats.setdefault(
+            self.player_id, StateWriteStats()
+        )
         await self.async_on_update()
+        # Home Assistant writes the initial state once the entity is added
+        self._state_snapshot = self.get_state_snapshot()
         self.async_on_remove(
-            self.mass.subscribe(
+            self.connection.subscribe(
                 self.__on_mass_update, EventType.PLAYER_UPDATED, self.player_id
             )
         )
+        self._update_queue_subscription()
+        self.async_on_remove(self._unsubscribe_queue_updates)
         self.async_on_remove(
-            self.mass.subscribe(
-                self.__on_mass_update,
-                EventType.QUEUE_UPDATED,
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_CONNECTION_STATE.format(self.platform.config_entry.entry_id),
+                self._async_handle_connection_state,
             )
         )
 
+    @property
+    def mass(self) -> MusicAssistantClient:
+        """Return the current client."""
+        return self.connection.client
+
+    @property
+    def entry_data(self) -> MusicAssistantEntryData:
+        """Return the runtime data of the config entry this entity belongs to."""
+        if TYPE_CHECKING:
+            assert self.platform.config_entry is not None
+        return cast("MusicAssistantEntryData", self.platform.config_entry.runtime_data)
+
     @property
     def player(self) -> Player:
         """Return the Mass Player attached to this HA entity."""
-        return self.mass.players[self.player_id]
+        if (player := self.mass.players.get(self.player_id)) is not None:
+            return player
+        if self._restored_player is None:
+            raise KeyError(self.player_id)
+        return self._restored_player
 
     @property
     def unique_id(self) -> str | None:
@@ -75,18 +157,110 @@ class MusicAssistantBaseEntity(Entity):
     @property
     def available(self) -> bool:
         """Return availability of entity."""
-        return self.player.available and self.mass.connection.connected
+        return (
+            self.mass.players.get(self.player_id) is not None
+            and self.player.available
+            and self.mass.connection.connected
+        )
+
+    @callback
+    def _update_queue_subscription(self) -> None:
+        """(Re)subscribe to updates of the queue(s) this player renders."""
+        player = self.player
+        queue_ids = {
+            queue_id
+            for queue_id in (
+                player.active_source,
+                player.active_group,
+                player.player_id,
+            )
+            if queue_id
+        }
+        if (
+            queue_ids == self._queue_ids
+            and player.active_source == self._active_source
+            and self._unsub_queue_updates
+        ):
+            return
+        self._unsubscribe_queue_updates()
+        self._queue_ids = queue_ids
+        self._active_source = player.active_source
+        queue_router = self.entry_data.queue_router
+        self._unsub_queue_updates.append(
+            queue_router.async_subscribe(self.__on_mass_update, queue_ids)
+        )
+        if player.active_source:
+            # we only get notified of big time jumps (e.g. seeking) of the queue
+            self._unsub_queue_updates.append(
+                queue_router.async_subscribe(
+                    self.__on_mass_update,
+                    (player.active_source,),
+                    EventType.QUEUE_TIME_UPDATED,
+                )
+            )
+
+    @callback
+    def _unsubscribe_queue_updates(self) -> None:
+        """Unsubscribe from queue updates."""
+        while self._unsub_queue_updates:
+            self._unsub_queue_updates.pop()()
 
     async def __on_mass_update(self, event: MassEvent) -> None:
         """Call when we receive an event from MusicAssistant."""
-        if event.event == EventType.QUEUE_UPDATED and event.object_id not in (
-            self.player.active_source,
-            self.player.active_group,
-            self.player.player_id,
-        ):
+        if event.event == EventType.PLAYER_UPDATED:
+            # the active source/group may have changed
+            self._update_queue_subscription()
+        if self._flush_next_update_until > time.monotonic():
+            self._flush_next_update_until = 0.0
+            await self.async_flush_update()
             return
+        if self._update_debouncer is not None:
+            self._update_debouncer.async_schedule_call()
+
+    async def _async_handle_connection_state(self) -> None:
+        """Handle the server connection being lost or restored."""
+        if self.mass.players.get(self.player_id) is None:
+            # player got removed while we were disconnected
+            return
+        self._restored_player = None
+        # the player and queues are refetched after a reconnect
+        self._update_queue_subscription()
+        await self.async_flush_update()
+
+    @callback
+    def async_flush_next_update(self) -> None:
+        """Write the next update right away, e.g. after a user-initiated command.
+
+        Only an update arriving within FLUSH_NEXT_UPDATE_TIMEOUT seconds is
+        flushed, so a command without state change does not affect later
+        (unrelated) updates.
+        """
+        self._flush_next_update_until = time.monotonic() + FLUSH_NEXT_UPDATE_TIMEOUT
+
+    async def async_flush_update(self) -> None:
+        """Write the state now, bypassing the coalescing window."""
+        if self._update_debouncer is not None:
+            self._update_debouncer.async_cancel()
+        await self._async_update_and_write()
+
+    async def _async_update_and_write(self) -> None:
+        """Process player updates and write the state (if anything changed)."""
         await self.async_on_update()
+        snapshot = self.get_state_snapshot()
+        if snapshot is not None and snapshot == self._state_snapshot:
+            self._write_stats.suppressed += 1
+            return
+        self._state_snapshot = snapshot
+        self._write_stats.written += 1
         self.async_write_ha_state()
 
+    def get_state_snapshot(self) -> Any:
+        """Return a comparable snapshot of the HA-visible state.
+
+        State writes are skipped when the snapshot did not change.
+        Return None to always write the state.
+        """
+        return None
+
     async def async_on_update(self) -> None:
         """Handle player updates."""
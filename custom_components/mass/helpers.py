@@ -3,16 +3,22 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Callable
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import Platform
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
 
 from .const import DOMAIN
 
 if TYPE_CHECKING:
     from music_assistant_client import MusicAssistantClient
 
+UNIQUE_ID_PREFIX = "mass_"
+
 
 @dataclass
 class MassEntryData:
@@ -35,3 +41,85 @@ def get_mass(
         mass_entry_data: MassEntryData = value
         return mass_entry_data.mass
     return None
+
+
+@callback
+def async_remove_player_device(
+    hass: HomeAssistant, entry_id: str, player_id: str
+) -> None:
+    """Remove the config entry from the device of a (removed) player."""
+    dev_reg = dr.async_get(hass)
+    if hass_device := dev_reg.async_get_device({(DOMAIN, player_id)}):
+        dev_reg.async_update_device(hass_device.id, remove_config_entry_id=entry_id)
+
+
+class PlayerEntityIndex:
+    """Bidirectional mapping of Music Assistant player_id and HA entity_id.
+
+    The mapping is built from the entity registry once and kept in sync
+    through entity registry update events, so translating (group) members
+    does not need a registry lookup per player on every update.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the index."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self._entity_ids: dict[str, str] = {}
+        self._player_ids: dict[str, str] = {}
+
+    @callback
+    def async_setup(self) -> Callable[[], None]:
+        """Build the index, return function to stop tracking the registry."""
+        entity_registry = er.async_get(self.hass)
+        for entity_entry in er.async_entries_for_config_entry(
+            entity_registry, self.entry_id
+        ):
+            self._async_add(entity_entry)
+        return self.hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_handle_registry_updated
+        )
+
+    @callback
+    def get_entity_id(self, player_id: str) -> str | None:
+        """Return the media_player entity_id for a Music Assistant player_id."""
+        return self._entity_ids.get(player_id)
+
+    @callback
+    def get_player_id(self, entity_id: str) -> str | None:
+        """Return the Music Assistant player_id for a media_player entity_id."""
+        return self._player_ids.get(entity_id)
+
+    @callback
+    def _async_add(self, entity_entry: er.RegistryEntry) -> None:
+        """Add a registry entry to the index (if it is one of our players)."""
+        if (
+            entity_entry.config_entry_id != self.entry_id
+            or entity_entry.platform != DOMAIN
+            or entity_entry.domain != Platform.MEDIA_PLAYER
+            or not entity_entry.unique_id.startswith(UNIQUE_ID_PREFIX)
+        ):
+            return
+        player_id = entity_entry.unique_id.removeprefix(UNIQUE_ID_PREFIX)
+        self._entity_ids[player_id] = entity_entry.entity_id
+        self._player_ids[entity_entry.entity_id] = player_id
+
+    @callback
+    def _async_remove(self, entity_id: str) -> None:
+        """Remove an entity_id from the index."""
+        if (player_id := self._player_ids.pop(entity_id, None)) is not None:
+            self._entity_ids.pop(player_id, None)
+
+    @callback
+    def _async_handle_registry_updated(
+        self, event: Event[er.EventEntityRegistryUpdatedData]
+    ) -> None:
+        """Keep the index in sync with the entity registry."""
+        data = event.data
+        if data["action"] == "update" and "old_entity_id" in data:
+            self._async_remove(data["old_entity_id"])
+        if data["action"] == "remove":
+            self._async_remove(data["entity_id"])
+            return
+        if entity_entry := er.async_get(self.hass).async_get(data["entity_id"]):
+            self._async_add(entity_entry)
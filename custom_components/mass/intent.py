@@ -25,10 +25,8 @@ from homeassistant.helpers.intent import (
     MatchTargetsConstraints,
     MatchFailedError,
 )
-from music_assistant_client.client import MusicAssistantClient
 from music_assistant_models.enums import MediaType
 from music_assistant_models.errors import MusicAssistantError
-from music_assistant_models.media_items import MediaItemType
 
 from . import DOMAIN
 from .const import (
@@ -41,7 +39,7 @@ from .const import (
 )
 
 if TYPE_CHECKING:
-    from . import MusicAssistantConfigEntry
+    from . import MusicAssistantConfigEntry, MusicAssistantEntryData
 
 INTENT_PLAY_MEDIA_ON_MEDIA_PLAYER = "MassPlayMediaOnMediaPlayer"
 INTENT_PLAY_MEDIA_ASSIST = "MassPlayMediaAssist"
@@ -128,20 +126,37 @@ class MassPlayMediaOnMediaPlayerHandler(intent.IntentHandler):
         )
 
     async def _get_media_items(
-        self, mass: MusicAssistantClient, media_id: str | list[str], media_type
-    ) -> MediaItemType | list[MediaItemType]:
+        self,
+        entry_data: MusicAssistantEntryData,
+        media_id: str | list[str],
+        media_type: str,
+    ) -> str | dict[str, Any] | list[str | dict[str, Any]] | None:
         if isinstance(media_id, list):
             return [
-                (
-                    await mass.music.get_item_by_name(
-                        item, media_type=MediaType(media_type)
-                    )
-                ).to_dict()
+                media_item
                 for item in media_id
+                if (
+                    media_item := await self._get_media_item(
+                        entry_data, item, media_type
+                    )
+                )
             ]
-        return await mass.music.get_item_by_name(
-            media_id, media_type=MediaType(media_type)
-        )
+        return await self._get_media_item(entry_data, media_id, media_type)
+
+    async def _get_media_item(
+        self, entry_data: MusicAssistantEntryData, name: str, media_type: str
+    ) -> str | dict[str, Any] | None:
+        """Return the uri (or media item) for a name."""
+        if (library_index := entry_data.library_index) and (
+            uri := library_index.resolve(name, media_type=MediaType(media_type))
+        ):
+            return uri
+        if item := await entry_data.media_name_cache.async_get_item_by_name(
+            name, media_type=MediaType(media_type)
+        ):
+            item_dict: dict[str, Any] = item.to_dict()
+            return item_dict
+        return None
 
     async def _get_matched_state(
         self, intent_obj: intent.Intent, match_constraints: MatchTargetsConstraints
@@ -197,16 +212,16 @@ class MassPlayMediaOnMediaPlayerHandler(intent.IntentHandler):
                 return response
             media_id = json_payload.get(ATTR_MEDIA_ID)
             media_type = json_payload.get(ATTR_MEDIA_TYPE)
-            media_item = await self._get_media_items(mass, media_id, media_type)
+            media_item = await self._get_media_items(
+                config_entry.runtime_data, media_id, media_type
+            )
             radio_mode = json_payload.get(ATTR_RADIO_MODE, False)
         if not media_item:
             raise intent.IntentHandleError("No media item found")
         try:
             await mass.player_queues.play_media(
                 queue_id=mass_player_id,
-                media=(
-                    media_item if isinstance(media_item, list) else media_item.to_dict()
-                ),
+                media=media_item,
                 radio_mode=radio_mode,
             )
         except MusicAssistantError as err:
@@ -0,0 +1,616 @@
+"""Local index of the Music Assistant library for fuzzy name lookups."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import time
+from array import array
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, TypedDict, cast
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from music_assistant_client.exceptions import MusicAssistantClientException
+from music_assistant_models.enums import EventType, MediaType
+from music_assistant_models.errors import MusicAssistantError
+
+from .const import DOMAIN, LOGGER, SIGNAL_CONNECTION_STATE
+
+if TYPE_CHECKING:
+    from music_assistant_client import MusicAssistantClient
+
+    from .connection import MusicAssistantConnection
+    from music_assistant_models.event import MassEvent
+    from music_assistant_models.media_items import MediaItemType
+
+# media types in the index, in order of preference for equal matches
+# (the same order the server uses for a lookup by name)
+INDEX_MEDIA_TYPES = (
+    MediaType.PLAYLIST,
+    MediaType.RADIO,
+    MediaType.TRACK,
+    MediaType.ALBUM,
+    MediaType.ARTIST,
+)
+LIBRARY_PAGE_SIZE = 500
+LIBRARY_INDEX_SAVE_DELAY = 60
+# removed items (holes) that are kept before the index is compacted
+LIBRARY_INDEX_COMPACT_MIN_REMOVED = 1000
+STORAGE_VERSION = 1
+# minimum (Dice) similarity of the trigrams to accept a fuzzy match
+MIN_MATCH_SCORE = 0.8
+
+
+def normalize_name(value: str) -> str:
+    """Normalize a name for matching."""
+    return " ".join(value.lower().split())
+
+
+def trigrams(value: str) -> set[str]:
+    """Return the trigrams of a normalized name."""
+    padded = f"  {value} "
+    return {padded[idx : idx + 3] for idx in range(len(padded) - 2)}
+
+
+type LibraryIndexRow = tuple[str, MediaType, str, str | None, Iterable[str]]
+
+
+def library_index_row(item: MediaItemType) -> LibraryIndexRow:
+    """Return the indexed fields of a media item."""
+    return (
+        item.uri,
+        item.media_type,
+        item.name,
+        item.sort_name,
+        [artist.name for artist in getattr(item, "artists", None) or ()],
+    )
+
+
+def _normalize_fields(
+    media_type: MediaType, name: str, sort_name: str | None, artists: Iterable[str]
+) -> tuple[int, str, str, str]:
+    """Return the fields of an item as they are stored in the index."""
+    name = normalize_name(name)
+    return (
+        INDEX_MEDIA_TYPES.index(media_type),
+        name,
+        normalize_name(sort_name) if sort_name else name,
+        "\n".join(normalize_name(artist) for artist in artists),
+    )
+
+
+class StoredLibraryIndex(TypedDict):
+    """Saved library index, stored column-wise to keep it compact."""
+
+    server_id: str
+    built_at: float
+    uris: list[str]
+    names: list[str]
+    sort_names: list[str]
+    artists: list[str]
+    media_types: list[int]
+
+
+class LibraryIndexData:
+    """Array-backed storage of the indexed library items.
+
+    Items are stored in parallel lists/arrays by position, the trigram
+    postings refer to these positions. The postings are only appended to:
+    a removed item leaves a hole (a tombstoned position) that is skipped
+    by the search, an updated item is removed and added at a new position.
+    Once the holes outnumber the items the index is compacted (rebuilt).
+    """
+
+    def __init__(self) -> None:
+        """Initialize the (empty) index data."""
+        self.uris: list[str | None] = []
+        self.names: list[str] = []
+        self.sort_names: list[str] = []
+        self.artists: list[str] = []
+        self.media_types = array("B")
+        self.gram_counts = array("H")
+        self.postings: dict[str, array[int]] = {}
+        self.positions: dict[str, int] = {}
+        # positions of the removed items (tombstones)
+        self.removed: set[int] = set()
+
+    def __len__(self) -> int:
+        """Return the number of items in the index."""
+        return len(self.positions)
+
+    @property
+    def needs_compact(self) -> bool:
+        """Return if the holes of the removed items should be dropped."""
+        return len(self.removed) > max(
+            LIBRARY_INDEX_COMPACT_MIN_REMOVED, len(self.positions)
+        )
+
+    def add(
+        self,
+        uri: str,
+        media_type: MediaType,
+        name: str,
+        sort_name: str | None,
+        artists: Iterable[str] = (),
+    ) -> None:
+        """Add (or update) an item."""
+        fields = _normalize_fields(media_type, name, sort_name, artists)
+        if (position := self.positions.get(uri)) is not None:
+            if self._fields(position) == fields:
+                return
+            self.remove(uri)
+        media_type_idx, name, sort_name, artists_str = fields
+        grams = trigrams(name) | trigrams(sort_name)
+        position = len(self.uris)
+        self.uris.append(uri)
+        self.names.append(name)
+        self.sort_names.append(sort_name)
+        self.artists.append(artists_str)
+        self.media_types.append(media_type_idx)
+        self.gram_counts.append(min(len(grams), 0xFFFF))
+        self.positions[uri] = position
+        for gram in grams:
+            if (posting := self.postings.get(gram)) is None:
+                posting = self.postings[gram] = array("I")
+            posting.append(position)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[LibraryIndexRow]) -> LibraryIndexData:
+        """Create the index data from the indexed fields of the items."""
+        data = cls()
+        for row in rows:
+            data.add(*row)
+        return data
+
+    @classmethod
+    def from_columns(cls, stored: StoredLibraryIndex) -> LibraryIndexData:
+        """Create the index data from its saved columns."""
+        data = cls()
+        for uri, name, sort_name, artists, media_type in zip(
+            stored["uris"],
+            stored["names"],
+            stored["sort_names"],
+            stored["artists"],
+            stored["media_types"],
+            strict=True,
+        ):
+            data.add(
+                uri,
+                INDEX_MEDIA_TYPES[media_type],
+                name,
+                sort_name,
+                artists.split("\n") if artists else (),
+            )
+        return data
+
+    def copy_columns(self) -> LibraryIndexData:
+        """Return a copy of the items (without postings), e.g. to save it."""
+        data = LibraryIndexData()
+        data.uris = self.uris.copy()
+        data.names = self.names.copy()
+        data.sort_names = self.sort_names.copy()
+        data.artists = self.artists.copy()
+        data.media_types = array("B", self.media_types)
+        data.positions = self.positions.copy()
+        return data
+
+    def to_columns(self) -> dict[str, list[Any]]:
+        """Return the (non removed) items as columns."""
+        positions = sorted(self.positions.values())
+        return {
+            "uris": [self.uris[position] for position in positions],
+            "names": [self.names[position] for position in positions],
+            "sort_names": [self.sort_names[position] for position in positions],
+            "artists": [self.artists[position] for position in positions],
+            "media_types": [self.media_types[position] for position in positions],
+        }
+
+    def diff(
+        self, rows: Iterable[LibraryIndexRow]
+    ) -> tuple[list[LibraryIndexRow], list[str]]:
+        """Return the rows that are new or changed and the uris that are gone."""
+        changed: list[LibraryIndexRow] = []
+        seen: set[str] = set()
+        for row in rows:
+            uri, media_type, name, sort_name, artists = row
+            seen.add(uri)
+            if (position := self.positions.get(uri)) is None or self._fields(
+                position
+            ) != _normalize_fields(media_type, name, sort_name, artists):
+                changed.append(row)
+        return changed, [uri for uri in self.positions if uri not in seen]
+
+    def remove(self, uri: str) -> None:
+        """Remove an item, its position is tombstoned (the postings are kept)."""
+        if (position := self.positions.pop(uri, None)) is None:
+            return
+        self.uris[position] = None
+        self.names[position] = self.sort_names[position] = self.artists[position] = ""
+        self.removed.add(position)
+
+    def compacted(self) -> LibraryIndexData:
+        """Return a new index data without the holes of the removed items.
+
+        This rebuilds the postings, so call it on a copy (see copy_columns)
+        in the executor.
+        """
+        return LibraryIndexData.from_rows(
+            (
+                uri,
+                INDEX_MEDIA_TYPES[self.media_types[position]],
+                self.names[position],
+                self.sort_names[position],
+                self.artists[position].split("\n") if self.artists[position] else (),
+            )
+            for uri, position in sorted(self.positions.items(), key=lambda x: x[1])
+        )
+
+    def _fields(self, position: int) -> tuple[int, str, str, str]:
+        """Return the (normalized) fields of the item at a position."""
+        return (
+            self.media_types[position],
+            self.names[position],
+            self.sort_names[position],
+            self.artists[position],
+        )
+
+    def search(
+        self,
+        name: str,
+        media_type: MediaType | None = None,
+        artist: str | None = None,
+        limit: int = 5,
+    ) -> list[tuple[float, str]]:
+        """Return the (score, uri) of the best matches for a name."""
+        query = normalize_name(name)
+        query_grams = trigrams(query)
+        artist = normalize_name(artist) if artist else None
+        media_type_idx = (
+            INDEX_MEDIA_TYPES.index(media_type)
+            if media_type in INDEX_MEDIA_TYPES
+            else None
+        )
+        common: dict[int, int] = {}
+        for gram in query_grams:
+            for position in self.postings.get(gram, ()):
+                common[position] = common.get(position, 0) + 1
+        matches: list[tuple[float, int, str]] = []
+        for position, count in common.items():
+            if position in self.removed:
+                continue
+            uri = cast(str, self.uris[position])
+            if media_type_idx is not None and (
+                self.media_types[position] != media_type_idx
+            ):
+                continue
+            if artist and artist not in self.artists[position].split("\n"):
+                continue
+            if query in (self.names[position], self.sort_names[position]):
+                score = 1.0
+            else:
+                score = (
+                    2 * count / (len(query_grams) + self.gram_counts[position]) * 0.99
+                )
+            # prefer the media types in order on equal scores
+            matches.append((score, -self.media_types[position], uri))
+        return [(score, uri) for score, _, uri in heapq.nlargest(limit, matches)]
+
+
+class LibraryIndex:
+    """Local index of the library, kept current by the library events.
+
+    The index is filled by paging through the library of the server and
+    answers lookups by name locally, with ranked fuzzy (trigram) matches.
+    It is saved to storage, so it can be used right after a restart, while
+    it is reconciled with the library in the background.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        connection: MusicAssistantConnection,
+    ) -> None:
+        """Initialize the index."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self.connection = connection
+        self.data = LibraryIndexData()
+        self.ready = False
+        # library changes while an index is built/loaded/compacted in the
+        # executor, replayed on the new index
+        self._pending: list[MassEvent] | None = None
+        # the build or compaction of the index, only one runs at a time
+        self._build_task: asyncio.Task | None = None
+        self._built_at = 0.0
+        self._store = _get_store(hass, entry_id)
+        self._unsub_save: Callable[[], None] | None = None
+
+    @property
+    def mass(self) -> MusicAssistantClient:
+        """Return the current client."""
+        return self.connection.client
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Start following the library events, return function to stop."""
+        unsubs = [
+            self.connection.subscribe(
+                self._on_media_item_event,
+                (
+                    EventType.MEDIA_ITEM_ADDED,
+                    EventType.MEDIA_ITEM_UPDATED,
+                    EventType.MEDIA_ITEM_DELETED,
+                ),
+            ),
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_CONNECTION_STATE.format(self.entry_id),
+                self._async_handle_connection_state,
+            ),
+            self.hass.bus.async_listen(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+            ),
+        ]
+        self._async_schedule_build()
+
+        @callback
+        def stop() -> None:
+            for unsub in unsubs:
+                unsub()
+            if self._build_task is not None:
+                self._build_task.cancel()
+            if self._unsub_save is not None:
+                # save the pending changes
+                self._unsub_save()
+                self._unsub_save = None
+                self.hass.async_create_task(self._async_save())
+
+        return stop
+
+    @callback
+    def _async_schedule_build(self) -> None:
+        """Build the index in the background (when connected)."""
+        if not self.mass.connection.connected or self._build_task is not None:
+            return
+        self._build_task = self.hass.async_create_background_task(
+            self.async_build(), "mass_build_library_index"
+        )
+
+    async def async_build(self) -> None:
+        """(Re)build the index from the library of the server."""
+        try:
+            await self._async_build()
+        except (MusicAssistantError, MusicAssistantClientException) as err:
+            LOGGER.warning("Unable to build the library index: %s", err)
+        finally:
+            self._pending = None
+            self._build_task = None
+
+    async def _async_build(self) -> None:
+        """Reconcile the (saved) index with the library or build a new one.
+
+        A saved index (or the index before a reconnect) misses the changes
+        made in the meantime, e.g. deleted or renamed items, so it is
+        compared with all items of the library.
+        """
+        if not self.ready:
+            await self._async_load()
+        self._pending = []
+        rows: list[LibraryIndexRow] = []
+        for func in self._library_functions():
+            offset = 0
+            while True:
+                items = await func(limit=LIBRARY_PAGE_SIZE, offset=offset)
+                rows.extend(library_index_row(item) for item in items)
+                if len(items) < LIBRARY_PAGE_SIZE:
+                    break
+                offset += len(items)
+        if self.ready:
+            changed, removed = await self.hass.async_add_executor_job(
+                self.data.copy_columns().diff, rows
+            )
+            for row in changed:
+                self.data.add(*row)
+            for uri in removed:
+                self.data.remove(uri)
+            self._async_set_data(self.data)
+            LOGGER.debug(
+                "Updated %s and removed %s items of the library index",
+                len(changed),
+                len(removed),
+            )
+        else:
+            # creating the trigram index takes a while for a large library
+            data = await self.hass.async_add_executor_job(
+                LibraryIndexData.from_rows, rows
+            )
+            self._async_set_data(data)
+            self.ready = True
+            LOGGER.debug("Indexed %s library items", len(data))
+        self._built_at = time.time()
+        self._async_schedule_save()
+
+    @callback
+    def _async_schedule_compact(self) -> None:
+        """Compact the index in the background, unless it is (re)built."""
+        if self._build_task is not None:
+            return
+        self._build_task = self.hass.async_create_background_task(
+            self._async_compact(), "mass_compact_library_index"
+        )
+
+    async def _async_compact(self) -> None:
+        """Drop the holes of the removed items, the postings are rebuilt."""
+        try:
+            self._pending = []
+            data = await self.hass.async_add_executor_job(
+                self.data.copy_columns().compacted
+            )
+            self._async_set_data(data)
+            LOGGER.debug("Compacted the library index to %s items", len(data))
+        finally:
+            self._pending = None
+            self._build_task = None
+
+    async def _async_load(self) -> None:
+        """Load the saved index (of the same server)."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        try:
+            if (
+                self.mass.server_info is None
+                or stored["server_id"] != self.mass.server_info.server_id
+            ):
+                return
+            built_at = float(stored["built_at"])
+            # (re)creating the trigram index takes a while for a large library
+            self._pending = []
+            data = await self.hass.async_add_executor_job(
+                LibraryIndexData.from_columns, stored
+            )
+        except (KeyError, TypeError, ValueError) as err:
+            # stale or malformed, e.g. the columns differ in length
+            LOGGER.warning("Discarding the saved library index: %s", err)
+            self._pending = None
+            await self._store.async_remove()
+            return
+        self._async_set_data(data)
+        self._built_at = built_at
+        self.ready = True
+        LOGGER.debug("Loaded %s items of the saved library index", len(self.data))
+
+    @callback
+    def _async_set_data(self, data: LibraryIndexData) -> None:
+        """Use a new index, with the library changes made while it was created."""
+        for event in self._pending or ():
+            self._apply_event(data, event)
+        self._pending = None
+        self.data = data
+
+    def _library_functions(self) -> list[Callable[..., Any]]:
+        """Return the functions to page through the library per media type."""
+        return [
+            self.mass.music.get_library_playlists,
+            self.mass.music.get_library_radios,
+            self.mass.music.get_library_tracks,
+            self.mass.music.get_library_albums,
+            self.mass.music.get_library_artists,
+        ]
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the index (delayed, changes often come in bursts)."""
+        if self.ready and self._unsub_save is None:
+            self._unsub_save = async_call_later(
+                self.hass, LIBRARY_INDEX_SAVE_DELAY, self._async_delayed_save
+            )
+
+    async def _async_delayed_save(self, _now: datetime) -> None:
+        """Save the index once the delay has passed."""
+        self._unsub_save = None
+        await self._async_save()
+
+    async def _async_final_write(self, event: Event) -> None:
+        """Save the pending changes when Home Assistant stops."""
+        if self._unsub_save is not None:
+            self._unsub_save()
+            self._unsub_save = None
+            await self._async_save()
+
+    async def _async_save(self) -> None:
+        """Save the index, the columns are assembled in the executor."""
+        if not self.ready or self.mass.server_info is None:
+            return
+        server_id = self.mass.server_info.server_id
+        columns = await self.hass.async_add_executor_job(
+            self.data.copy_columns().to_columns
+        )
+        await self._store.async_save(
+            cast(
+                StoredLibraryIndex,
+                {"server_id": server_id, "built_at": self._built_at, **columns},
+            )
+        )
+
+    def resolve(
+        self,
+        name: str,
+        artist: str | None = None,
+        album: str | None = None,
+        media_type: MediaType | None = None,
+    ) -> str | None:
+        """Return the uri of the best (confident) match for a name, if any."""
+        if not self.ready or album:
+            # album filter is not indexed, leave it to the server
+            return None
+        if matches := self.data.search(name, media_type, artist, limit=1):
+            score, uri = matches[0]
+            if score >= MIN_MATCH_SCORE:
+                return uri
+        return None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the index statistics as a (diagnostics) dict."""
+        return {
+            "ready": self.ready,
+            "items": len(self.data),
+            "removed": len(self.data.removed),
+            "trigrams": len(self.data.postings),
+        }
+
+    @callback
+    def _on_media_item_event(self, event: MassEvent) -> None:
+        """Apply a library change to the index."""
+        if self._pending is not None:
+            self._pending.append(event)
+        if self._apply_event(self.data, event):
+            self._async_schedule_save()
+            if self.data.needs_compact:
+                self._async_schedule_compact()
+
+    @staticmethod
+    def _apply_event(data: LibraryIndexData, event: MassEvent) -> bool:
+        """Apply a library change to index data, return True if applied."""
+        if event.object_id is None:
+            return False
+        if event.event == EventType.MEDIA_ITEM_DELETED:
+            data.remove(event.object_id)
+            return True
+        item = event.data
+        if not isinstance(item, dict) or item.get("provider") != "library":
+            return False
+        try:
+            media_type = MediaType(item["media_type"])
+        except (KeyError, ValueError):
+            return False
+        if media_type not in INDEX_MEDIA_TYPES:
+            return False
+        data.add(
+            event.object_id,
+            media_type,
+            item.get("name") or "",
+            item.get("sort_name"),
+            [artist["name"] for artist in item.get("artists") or ()],
+        )
+        return True
+
+    @callback
+    def _async_handle_connection_state(self) -> None:
+        """Update the index once connected, we may have missed events."""
+        self._async_schedule_build()
+
+
+def _get_store(hass: HomeAssistant, entry_id: str) -> Store[StoredLibraryIndex]:
+    """Return the store for the library index of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.library_index.{entry_id}")
+
+
+async def async_remove_library_index(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the saved library index of a config entry."""
+    await _get_store(hass, entry_id).async_remove()
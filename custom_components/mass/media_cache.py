@@ -0,0 +1,361 @@
+"""Caches of media lookups on the Music Assistant server."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qs, urlparse
+
+import jwt
+from homeassistant.components.http.auth import SIGN_QUERY_PARAM
+from homeassistant.core import HomeAssistant, callback
+from music_assistant_models.enums import EventType, MediaType
+
+if TYPE_CHECKING:
+    from music_assistant_client import MusicAssistantClient
+
+    from .connection import MusicAssistantConnection
+    from music_assistant_models.event import MassEvent
+    from music_assistant_models.media_items import MediaItemType, SearchResults
+
+type MediaNameKey = tuple[str, str | None, str | None, MediaType | None]
+type SearchKey = tuple[str, tuple[MediaType, ...], int, bool]
+
+NAME_CACHE_MAX_SIZE = 256
+NAME_CACHE_TTL = 3600
+FILE_CACHE_MAX_SIZE = 256
+FILE_CACHE_TTL = 30
+MEDIA_SOURCE_CACHE_MAX_SIZE = 64
+MEDIA_SOURCE_CACHE_TTL = 300
+SEARCH_CACHE_MAX_SIZE = 64
+SEARCH_CACHE_TTL = 60
+# seconds before the expiry of a signed url we stop handing it out
+SIGNED_URL_EXPIRY_MARGIN = 60
+
+
+def _normalize(value: str | None) -> str | None:
+    """Normalize a name for use in a cache key."""
+    return " ".join(value.lower().split()) if value else None
+
+
+class MediaNameCache:
+    """Cache the media items found by name (e.g. for voice/automations).
+
+    Entries expire after NAME_CACHE_TTL seconds, the least recently used
+    entry is evicted when the cache is full and entries are invalidated
+    by the media item events of the server.
+    """
+
+    def __init__(
+        self,
+        connection: MusicAssistantConnection,
+        max_size: int = NAME_CACHE_MAX_SIZE,
+        ttl: float = NAME_CACHE_TTL,
+    ) -> None:
+        """Initialize the cache."""
+        self.connection = connection
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[MediaNameKey, tuple[float, MediaItemType]] = (
+            OrderedDict()
+        )
+
+    @property
+    def mass(self) -> MusicAssistantClient:
+        """Return the current client."""
+        return self.connection.client
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Start listening to media item events, return function to stop."""
+        return self.connection.subscribe(
+            self._on_media_item_event,
+            (
+                EventType.MEDIA_ITEM_ADDED,
+                EventType.MEDIA_ITEM_UPDATED,
+                EventType.MEDIA_ITEM_DELETED,
+            ),
+        )
+
+    async def async_get_item_by_name(
+        self,
+        name: str,
+        artist: str | None = None,
+        album: str | None = None,
+        media_type: MediaType | None = None,
+    ) -> MediaItemType | None:
+        """Return the media item for a name, from the cache if possible."""
+        key = (
+            _normalize(name) or "",
+            _normalize(artist),
+            _normalize(album),
+            media_type,
+        )
+        if (cached := self._cache.get(key)) is not None:
+            if cached[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            del self._cache[key]
+        self.misses += 1
+        item = await self.mass.music.get_item_by_name(
+            name=name, artist=artist, album=album, media_type=media_type
+        )
+        if item is not None:
+            self._cache[key] = (time.monotonic() + self.ttl, item)
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return item
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cache statistics as a (diagnostics) dict."""
+        return {"size": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+    @callback
+    def _on_media_item_event(self, event: MassEvent) -> None:
+        """Invalidate the entries affected by an added/updated/deleted item."""
+        if not self._cache:
+            return
+        # a (new) item with the same name may now be the better match
+        names = set()
+        if isinstance(event.data, dict) and (
+            name := _normalize(event.data.get("name"))
+        ):
+            names.add(name)
+        for key in [
+            key
+            for key, (_, item) in self._cache.items()
+            if item.uri == event.object_id or key[0] in names
+        ]:
+            del self._cache[key]
+
+
+class SearchCache:
+    """Share identical (in flight) searches and cache their results.
+
+    Results expire after SEARCH_CACHE_TTL seconds and all results are
+    invalidated when items are added to or deleted from the library.
+    Updated items (e.g. play counts during playback) are left to the TTL.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: MusicAssistantConnection,
+        max_size: int = SEARCH_CACHE_MAX_SIZE,
+        ttl: float = SEARCH_CACHE_TTL,
+    ) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self.connection = connection
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[SearchKey, tuple[float, SearchResults]] = OrderedDict()
+        self._in_flight: dict[SearchKey, asyncio.Task[SearchResults]] = {}
+        # bumped on every invalidation, to not cache results of older searches
+        self._generation = 0
+
+    @property
+    def mass(self) -> MusicAssistantClient:
+        """Return the current client."""
+        return self.connection.client
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Start listening to library changes, return function to stop."""
+        return self.connection.subscribe(
+            self._on_library_event,
+            (EventType.MEDIA_ITEM_ADDED, EventType.MEDIA_ITEM_DELETED),
+        )
+
+    async def async_search(
+        self,
+        search_query: str,
+        media_types: list[MediaType],
+        limit: int,
+        library_only: bool,
+    ) -> SearchResults:
+        """Return the results of a search, shared with identical searches."""
+        key = (
+            search_query,
+            tuple(sorted(media_types))
+            if isinstance(media_types, list)
+            else (media_types,),
+            limit,
+            library_only,
+        )
+        if (cached := self._cache.get(key)) is not None:
+            if cached[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            del self._cache[key]
+        if (task := self._in_flight.get(key)) is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            task = self.hass.async_create_background_task(
+                self._async_search(key, search_query, media_types, limit, library_only),
+                f"mass_search_{search_query}",
+            )
+            # the callers may all be gone (cancelled) before it is done
+            task.add_done_callback(_consume_result)
+            self._in_flight[key] = task
+        # a cancelled caller should not cancel the search of the others
+        return await asyncio.shield(task)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cache statistics as a (diagnostics) dict."""
+        return {
+            "size": len(self._cache),
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    async def _async_search(
+        self,
+        key: SearchKey,
+        search_query: str,
+        media_types: list[MediaType],
+        limit: int,
+        library_only: bool,
+    ) -> SearchResults:
+        """Search on the server and cache the results."""
+        generation = self._generation
+        try:
+            results = await self.mass.music.search(
+                search_query=search_query,
+                media_types=media_types,
+                limit=limit,
+                library_only=library_only,
+            )
+        finally:
+            if self._in_flight.get(key) is asyncio.current_task():
+                del self._in_flight[key]
+        if generation == self._generation:
+            self._cache[key] = (time.monotonic() + self.ttl, results)
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return results
+
+    @callback
+    def _on_library_event(self, event: MassEvent) -> None:
+        """Invalidate all results when an item is added or deleted."""
+        self._generation += 1
+        self._cache.clear()
+        # new searches should not join a search started before the change
+        self._in_flight.clear()
+
+
+def _consume_result(task: asyncio.Task[Any]) -> None:
+    """Retrieve the exception of a shared task, its callers handle it."""
+    if not task.cancelled():
+        task.exception()
+
+
+def _check_files(paths: list[str]) -> list[bool]:
+    """Return for every path if it is a (local) file."""
+    return [os.path.isfile(path) for path in paths]
+
+
+class LocalFileCache:
+    """Check if media ids are local files, with a short-lived cache.
+
+    All paths that are not cached (anymore) are checked in a single
+    executor job.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_size: int = FILE_CACHE_MAX_SIZE,
+        ttl: float = FILE_CACHE_TTL,
+    ) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache: dict[str, tuple[float, bool]] = {}
+
+    async def async_is_file(self, paths: list[str]) -> dict[str, bool]:
+        """Return for every path if it is a (local) file."""
+        now = time.monotonic()
+        result: dict[str, bool] = {}
+        for path in paths:
+            if (cached := self._cache.get(path)) is not None and cached[0] > now:
+                result[path] = cached[1]
+        if unchecked := [path for path in dict.fromkeys(paths) if path not in result]:
+            is_file = await self.hass.async_add_executor_job(_check_files, unchecked)
+            expires = time.monotonic() + self.ttl
+            for path, path_is_file in zip(unchecked, is_file, strict=True):
+                result[path] = path_is_file
+                self._cache.pop(path, None)
+                self._cache[path] = (expires, path_is_file)
+            while len(self._cache) > self.max_size:
+                # drop the oldest check
+                del self._cache[next(iter(self._cache))]
+        return result
+
+
+def _signed_url_expires_in(url: str) -> float | None:
+    """Return the seconds until a signed url expires (None if not signed)."""
+    if not (signatures := parse_qs(urlparse(url).query).get(SIGN_QUERY_PARAM)):
+        return None
+    try:
+        claims = jwt.decode(signatures[0], options={"verify_signature": False})
+        return float(claims["exp"]) - time.time()
+    except (jwt.InvalidTokenError, KeyError, TypeError, ValueError):
+        # unknown expiry
+        return 0
+
+
+class MediaSourceCache:
+    """Short-lived cache of the (playable) urls of resolved media source ids.
+
+    Urls signed by Home Assistant are only handed out until shortly before
+    their signature expires.
+    """
+
+    def __init__(
+        self,
+        max_size: int = MEDIA_SOURCE_CACHE_MAX_SIZE,
+        ttl: float = MEDIA_SOURCE_CACHE_TTL,
+    ) -> None:
+        """Initialize the cache."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache: dict[tuple[str, str | None], tuple[float, str]] = {}
+
+    @callback
+    def get(self, media_id: str, entity_id: str | None) -> str | None:
+        """Return the cached url of a media source id for an entity."""
+        if (cached := self._cache.get((media_id, entity_id))) is None:
+            return None
+        if cached[0] > time.monotonic():
+            return cached[1]
+        del self._cache[(media_id, entity_id)]
+        return None
+
+    @callback
+    def set(self, media_id: str, entity_id: str | None, url: str) -> None:
+        """Cache the url of a media source id for an entity."""
+        ttl = self.ttl
+        if (expires_in := _signed_url_expires_in(url)) is not None:
+            ttl = min(ttl, expires_in - SIGNED_URL_EXPIRY_MARGIN)
+        if ttl <= 0:
+            return
+        key = (media_id, entity_id)
+        self._cache.pop(key, None)
+        self._cache[key] = (time.monotonic() + ttl, url)
+        while len(self._cache) > self.max_size:
+            # drop the oldest url
+            del self._cache[next(iter(self._cache))]
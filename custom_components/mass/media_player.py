@@ -4,9 +4,12 @@ from __future__ import annotations
 
 import asyncio
 import functools
-import os
-from collections.abc import Awaitable, Callable, Coroutine, Mapping
-from contextlib import suppress
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable, Coroutine, Mapping
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+from datetime import datetime
 from typing import TYPE_CHECKING, Any, cast
 
 import homeassistant.helpers.config_validation as cv
@@ -29,24 +32,36 @@ from homeassistant.components.media_player import (
     RepeatMode,
     async_process_play_media_url,
 )
+from homeassistant.components.media_player.const import (
+    ATTR_MEDIA_VOLUME_LEVEL,
+    ATTR_MEDIA_VOLUME_MUTED,
+)
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.const import STATE_OFF
-from homeassistant.core import HomeAssistant, ServiceResponse, SupportsResponse
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import (
     AddEntitiesCallback,
     async_get_current_platform,
 )
+from homeassistant.helpers.event import async_call_later
 from homeassistant.util.dt import utc_from_timestamp
+from music_assistant_client.exceptions import MusicAssistantClientException
 from music_assistant_models.enums import EventType, MediaType, PlayerFeature
 from music_assistant_models.enums import PlayerState as MassPlayerState
 from music_assistant_models.enums import QueueOption
 from music_assistant_models.enums import RepeatMode as MassRepeatMode
 from music_assistant_models.errors import MediaNotFoundError, MusicAssistantError
 from music_assistant_models.event import MassEvent
-from music_assistant_models.media_items import ItemMapping, MediaItemType, Track
+from music_assistant_models.media_items import ItemMapping, MediaItemType
 
+from .commands import PlayerCommandChannel
 from .const import (
     ATTR_ACTIVE_QUEUE,
     ATTR_MASS_PLAYER_TYPE,
@@ -54,17 +69,20 @@ from .const import (
     ATTR_MEDIA_TYPE,
     ATTR_RADIO_MODE,
     DOMAIN,
+    LOGGER,
     SERVICE_PLAY_MEDIA_ADVANCED,
+    SIGNAL_CONNECTION_STATE,
 )
 from .entity import MusicAssistantBaseEntity
 from .media_browser import async_browse_media
+from .queue_media import compact_queue_item
 
 if TYPE_CHECKING:
-    from music_assistant_client import MusicAssistantClient
     from music_assistant_models.player import Player
     from music_assistant_models.player_queue import PlayerQueue
 
     from . import MusicAssistantConfigEntry
+    from .connection import MusicAssistantConnection
 
 SUPPORTED_FEATURES = (
     MediaPlayerEntityFeature.PAUSE
@@ -98,6 +116,7 @@ QUEUE_OPTION_MAP = {
 SERVICE_PLAY_ANNOUNCEMEMT = "play_announcement"
 SERVICE_TRANSFER_QUEUE = "transfer_queue"
 SERVICE_GET_QUEUE = "get_queue"
+SERVICE_BULK_PLAYER_COMMAND = "bulk_player_command"
 ATTR_ARTIST = "artist"
 ATTR_ALBUM = "album"
 ATTR_URL = "url"
@@ -105,23 +124,91 @@ ATTR_USE_PRE_ANNOUNCE = "use_pre_announce"
 ATTR_ANNOUNCE_VOLUME = "announce_volume"
 ATTR_SOURCE_PLAYER = "source_player"
 ATTR_AUTO_PLAY = "auto_play"
+ATTR_COMMAND = "command"
+ATTR_OFFSET = "offset"
+ATTR_LIMIT = "limit"
+ATTR_AROUND_CURRENT = "around_current"
+ATTR_QUEUE_ITEMS = "queue_items"
+BULK_PLAYER_COMMANDS = (
+    "play",
+    "pause",
+    "stop",
+    "turn_on",
+    "turn_off",
+    "volume_set",
+    "volume_mute",
+)
+# player features the bulk player commands require
+BULK_PLAYER_COMMAND_FEATURES = {
+    "volume_set": PlayerFeature.VOLUME_SET,
+    "volume_mute": PlayerFeature.VOLUME_MUTE,
+}
+# seconds to wait for the server to confirm an optimistic state change
+OPTIMISTIC_STATE_TIMEOUT = 5
+# commands that do not change the state of the player
+READ_ONLY_COMMANDS = frozenset({"handle_get_queue"})
+GET_QUEUE_DEFAULT_ITEMS = 25
+GET_QUEUE_MAX_ITEMS = 500
+# max number of media ids of a play_media call that are resolved at once
+PLAY_MEDIA_RESOLVE_CONCURRENCY = 5
+# seconds to resolve all media ids of a play_media call
+PLAY_MEDIA_RESOLVE_TIMEOUT = 30
+
+
+@dataclass(slots=True, frozen=True)
+class MediaPlayerStateSnapshot:
+    """Snapshot of the derived (HA-visible) attributes of a player."""
+
+    available: bool
+    state: MediaPlayerState | None
+    volume_level: float | None
+    is_volume_muted: bool | None
+    group_members: tuple[str, ...]
+    active_queue: str | None
+    app_id: str | None
+    source: str | None
+    shuffle: bool | None
+    repeat: RepeatMode | str | None
+    media_content_id: str | None
+    media_title: str | None
+    media_artist: str | None
+    media_album_name: str | None
+    media_album_artist: str | None
+    media_duration: int | None
+    media_position: int | None
+    media_position_updated_at: datetime | None
+    media_image_url: str | None
+    media_image_remotely_accessible: bool
 
 
 def catch_musicassistant_error[_R, **P](
     func: Callable[..., Awaitable[_R]],
 ) -> Callable[..., Coroutine[Any, Any, _R | None]]:
-    """Check and log commands to players."""
+    """Check, log and measure commands to players."""
+    command = func.__name__.lstrip("_").removeprefix("async_")
 
     @functools.wraps(func)
     async def wrapper(
         self: MusicAssistantPlayer, *args: P.args, **kwargs: P.kwargs
     ) -> _R | None:
         """Catch Music Assistant errors and convert to Home Assistant error."""
+        error = True
+        start = time.monotonic()
         try:
-            return await func(self, *args, **kwargs)
-        except MusicAssistantError as err:
+            result = await func(self, *args, **kwargs)
+            error = False
+        except (MusicAssistantError, MusicAssistantClientException) as err:
+            # client errors, e.g. when the server is not connected
             error_msg = str(err) or err.__class__.__name__
             raise HomeAssistantError(error_msg) from err
+        finally:
+            self.entry_data.command_metrics.record(
+                command, self.player_id, time.monotonic() - start, error
+            )
+        if command not in READ_ONLY_COMMANDS:
+            # the result of a user-initiated command should not be delayed
+            self.async_flush_next_update()
+        return result
 
     return wrapper
 
@@ -132,7 +219,7 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Music Assistant MediaPlayer(s) from Config Entry."""
-    mass = entry.runtime_data.mass
+    connection = entry.runtime_data.connection
     added_ids = set()
 
     async def handle_player_added(event: MassEvent) -> None:
@@ -142,15 +229,45 @@ async def async_setup_entry(
         if event.object_id in added_ids:
             return
         added_ids.add(event.object_id)
-        async_add_entities([MusicAssistantPlayer(mass, event.object_id)])
+        async_add_entities([MusicAssistantPlayer(connection, event.object_id)])
 
     # register listener for new players
-    entry.async_on_unload(mass.subscribe(handle_player_added, EventType.PLAYER_ADDED))
+    entry.async_on_unload(
+        connection.subscribe(handle_player_added, EventType.PLAYER_ADDED)
+    )
+
+    @callback
+    def handle_connection_state() -> None:
+        """Add players that were added while we were disconnected."""
+        if new_players := [
+            MusicAssistantPlayer(connection, player.player_id)
+            for player in connection.client.players
+            if player.player_id not in added_ids
+        ]:
+            added_ids.update(player.player_id for player in new_players)
+            async_add_entities(new_players)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_CONNECTION_STATE.format(entry.entry_id),
+            handle_connection_state,
+        )
+    )
     mass_players = []
     # add all current players
-    for player in mass.players:
-        added_ids.add(player.player_id)
-        mass_players.append(MusicAssistantPlayer(mass, player.player_id))
+    with entry.runtime_data.setup_timings.measure("create_player_entities"):
+        for player in connection.client.players:
+            added_ids.add(player.player_id)
+            mass_players.append(MusicAssistantPlayer(connection, player.player_id))
+        # on a warm start the client is still syncing the players
+        for player in entry.runtime_data.snapshot_store.restored_players.values():
+            if player.player_id in added_ids:
+                continue
+            added_ids.add(player.player_id)
+            mass_players.append(
+                MusicAssistantPlayer(connection, player.player_id, player)
+            )
 
     async_add_entities(mass_players)
 
@@ -172,6 +289,7 @@ async def async_setup_entry(
             vol.Optional(ATTR_ANNOUNCE_VOLUME): vol.Coerce(int),
         },
         "_async_handle_play_media",
+        supports_response=SupportsResponse.OPTIONAL,
     )
     platform.async_register_entity_service(
         SERVICE_PLAY_ANNOUNCEMEMT,
@@ -192,10 +310,59 @@ async def async_setup_entry(
     )
     platform.async_register_entity_service(
         SERVICE_GET_QUEUE,
-        schema=None,
+        schema=vol.All(
+            cv.make_entity_service_schema(
+                {
+                    vol.Optional(ATTR_OFFSET): cv.positive_int,
+                    vol.Optional(ATTR_LIMIT): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=GET_QUEUE_MAX_ITEMS)
+                    ),
+                    vol.Optional(ATTR_AROUND_CURRENT): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=0, max=GET_QUEUE_MAX_ITEMS // 2),
+                    ),
+                }
+            ),
+            _validate_get_queue,
+        ),
         func="_async_handle_get_queue",
         supports_response=SupportsResponse.ONLY,
     )
+    platform.async_register_entity_service(
+        SERVICE_BULK_PLAYER_COMMAND,
+        vol.All(
+            cv.make_entity_service_schema(
+                {
+                    vol.Required(ATTR_COMMAND): vol.In(BULK_PLAYER_COMMANDS),
+                    vol.Optional(ATTR_MEDIA_VOLUME_LEVEL): vol.All(
+                        vol.Coerce(float), vol.Range(min=0, max=1)
+                    ),
+                    vol.Optional(ATTR_MEDIA_VOLUME_MUTED): cv.boolean,
+                }
+            ),
+            _validate_bulk_player_command,
+        ),
+        "_async_handle_bulk_player_command",
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def _validate_bulk_player_command(data: dict[str, Any]) -> dict[str, Any]:
+    """Validate the command of a bulk_player_command has its value."""
+    if data[ATTR_COMMAND] == "volume_set" and ATTR_MEDIA_VOLUME_LEVEL not in data:
+        raise vol.Invalid(f"{ATTR_MEDIA_VOLUME_LEVEL} is required for volume_set")
+    if data[ATTR_COMMAND] == "volume_mute" and ATTR_MEDIA_VOLUME_MUTED not in data:
+        raise vol.Invalid(f"{ATTR_MEDIA_VOLUME_MUTED} is required for volume_mute")
+    return data
+
+
+def _validate_get_queue(data: dict[str, Any]) -> dict[str, Any]:
+    """Validate a get_queue window is either around the current item or not."""
+    if ATTR_AROUND_CURRENT in data and (ATTR_OFFSET in data or ATTR_LIMIT in data):
+        raise vol.Invalid(
+            f"{ATTR_AROUND_CURRENT} can not be combined with {ATTR_OFFSET}/{ATTR_LIMIT}"
+        )
+    return data
 
 
 class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
@@ -205,41 +372,47 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
     _attr_media_image_remotely_accessible = True
     _attr_media_content_type = HAMediaType.MUSIC
 
-    def __init__(self, mass: MusicAssistantClient, player_id: str) -> None:
+    def __init__(
+        self,
+        connection: MusicAssistantConnection,
+        player_id: str,
+        restored_player: Player | None = None,
+    ) -> None:
         """Initialize MediaPlayer entity."""
-        super().__init__(mass, player_id)
+        super().__init__(connection, player_id, restored_player)
         self._attr_icon = self.player.icon.replace("mdi-", "mdi:")
         self._attr_supported_features = SUPPORTED_FEATURES
         if PlayerFeature.SET_MEMBERS in self.player.supported_features:
             self._attr_supported_features |= MediaPlayerEntityFeature.GROUPING
         self._attr_device_class = MediaPlayerDeviceClass.SPEAKER
-        self._prev_time: float = 0
+        self._command_channel: PlayerCommandChannel
+        self._optimistic_state: dict[str, Any] = {}
+        # optimistic attributes of the commands that are still being sent
+        self._optimistic_in_flight: Counter[str] = Counter()
+        self._unsub_optimistic_timeout: Callable[[], None] | None = None
 
     async def async_added_to_hass(self) -> None:
         """Register callbacks."""
         await super().async_added_to_hass()
+        if TYPE_CHECKING:
+            assert self.platform.config_entry is not None
+        # commands to a player are sent in order, different players in parallel
+        self._command_channel = PlayerCommandChannel(
+            self.hass, self.platform.config_entry, self.player_id
+        )
+        self.entry_data.command_channels[self.player_id] = self._command_channel
+        self.async_on_remove(self._async_remove_command_channel)
+        self.async_on_remove(self._cancel_optimistic_timeout)
 
         # we need to get the hass object in order to get our config entry
         # and expose the player to the conversation component, assuming that
         # the config entry has the option enabled.
-        await self._expose_players_assist()
-
-        # we subscribe to player queue time update but we only
-        # accept a state change on big time jumps (e.g. seeking)
-        async def queue_time_updated(event: MassEvent) -> None:
-            if event.object_id != self.player.active_source:
-                return
-            if abs((self._prev_time or 0) - event.data) > 5:
-                await self.async_on_update()
-                self.async_write_ha_state()
-            self._prev_time = event.data
-
-        self.async_on_remove(
-            self.mass.subscribe(
-                queue_time_updated,
-                EventType.QUEUE_TIME_UPDATED,
-            )
-        )
+        if self.platform.config_entry.state is not ConfigEntryState.SETUP_IN_PROGRESS:
+            # players added later on are not part of the setup timings
+            await self._expose_players_assist()
+            return
+        with self.entry_data.setup_timings.measure("expose_players_assist"):
+            await self._expose_players_assist()
 
     @property
     def active_queue(self) -> PlayerQueue | None:
@@ -258,6 +431,31 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
             ),
         }
 
+    def get_state_snapshot(self) -> MediaPlayerStateSnapshot:
+        """Return a comparable snapshot of the HA-visible state."""
+        return MediaPlayerStateSnapshot(
+            available=self.available,
+            state=self._attr_state,
+            volume_level=self._attr_volume_level,
+            is_volume_muted=self._attr_is_volume_muted,
+            group_members=tuple(self._attr_group_members or ()),
+            active_queue=self.active_queue.queue_id if self.active_queue else None,
+            app_id=self._attr_app_id,
+            source=self._attr_source,
+            shuffle=self._attr_shuffle,
+            repeat=self._attr_repeat,
+            media_content_id=self._attr_media_content_id,
+            media_title=self._attr_media_title,
+            media_artist=self._attr_media_artist,
+            media_album_name=self._attr_media_album_name,
+            media_album_artist=self._attr_media_album_artist,
+            media_duration=self._attr_media_duration,
+            media_position=self._attr_media_position,
+            media_position_updated_at=self._attr_media_position_updated_at,
+            media_image_url=self._attr_media_image_url,
+            media_image_remotely_accessible=self._attr_media_image_remotely_accessible,
+        )
+
     async def async_on_update(self) -> None:
         """Handle player updates."""
         if not self.available:
@@ -271,19 +469,13 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
             self._attr_state = MediaPlayerState(player.state.value)
         else:
             self._attr_state = MediaPlayerState(STATE_OFF)
-        group_members_entity_ids: list[str] = []
-        if player.group_childs:
-            # translate MA group_childs to HA group_members as entity id's
-            entity_registry = er.async_get(self.hass)
-            group_members_entity_ids = [
-                entity_id
-                for child_id in player.group_childs
-                if (
-                    entity_id := entity_registry.async_get_entity_id(
-                        self.platform.domain, DOMAIN, f"mass_{child_id}"
-                    )
-                )
-            ]
+        # translate MA group_childs to HA group_members as entity id's
+        player_entity_index = self.entry_data.player_entity_index
+        group_members_entity_ids: list[str] = [
+            entity_id
+            for child_id in player.group_childs
+            if (entity_id := player_entity_index.get_entity_id(child_id))
+        ]
         self._attr_group_members = group_members_entity_ids
         self._attr_volume_level = (
             player.volume_level / 100 if player.volume_level is not None else None
@@ -291,86 +483,227 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
         self._attr_is_volume_muted = player.volume_muted
         self._update_media_attributes(player, active_queue)
         self._update_media_image_url(player, active_queue)
+        if self._optimistic_state:
+            self._reconcile_optimistic_state()
+
+    @callback
+    def _async_remove_command_channel(self) -> None:
+        """Stop the command channel of this player."""
+        self.entry_data.command_channels.pop(self.player_id, None)
+        self._command_channel.shutdown()
+
+    async def _async_send_command(
+        self,
+        command: Callable[..., Awaitable[Any]],
+        *args: Any,
+        coalesce_key: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Send a command through the (ordered) command channel of this player.
+
+        Only the transport, volume and power commands, for which the order
+        matters, go through the channel.
+        """
+        await self._command_channel.async_send(
+            functools.partial(command, *args, **kwargs), coalesce_key
+        )
+
+    async def _async_send_queue_command(
+        self,
+        command: Callable[..., Awaitable[Any]],
+        queue_id: str,
+        *args: Any,
+    ) -> None:
+        """Send a command through the (ordered) command channel of a queue."""
+        channels = self.entry_data.queue_command_channels
+        if (channel := channels.get(queue_id)) is None:
+            if TYPE_CHECKING:
+                assert self.platform.config_entry is not None
+            channel = channels[queue_id] = PlayerCommandChannel(
+                self.hass, self.platform.config_entry, queue_id
+            )
+        await channel.async_send(functools.partial(command, queue_id, *args))
+
+    @asynccontextmanager
+    async def _optimistic(self, **attributes: Any) -> AsyncIterator[None]:
+        """Apply the (expected) result of a command before the server confirms it.
+
+        The optimistic attributes are kept over the (older) player/queue
+        updates that arrive while the command is sent. Once it is sent, the
+        next update is final: it confirms the attributes or overrides them,
+        e.g. when the player rejected the command or the server clamped the
+        value. They are rolled back if the command fails or no update
+        arrives in time.
+        """
+        self._optimistic_state.update(attributes)
+        self._optimistic_in_flight.update(attributes.keys())
+        self._cancel_optimistic_timeout()
+        self._unsub_optimistic_timeout = async_call_later(
+            self.hass, OPTIMISTIC_STATE_TIMEOUT, self._async_optimistic_timeout
+        )
+        try:
+            await self.async_flush_update()
+            yield
+        except Exception:
+            for attribute, value in attributes.items():
+                if self._optimistic_state.get(attribute) == value:
+                    del self._optimistic_state[attribute]
+            await self.async_flush_update()
+            raise
+        finally:
+            self._optimistic_in_flight.subtract(attributes.keys())
+
+    @callback
+    def _reconcile_optimistic_state(self) -> None:
+        """Keep the optimistic attributes of the commands still being sent."""
+        for attribute, value in list(self._optimistic_state.items()):
+            if (
+                getattr(self, f"_attr_{attribute}") == value
+                or self._optimistic_in_flight[attribute] <= 0
+            ):
+                # confirmed, or the server state after the command wins
+                del self._optimistic_state[attribute]
+            else:
+                setattr(self, f"_attr_{attribute}", value)
+        if not self._optimistic_state:
+            self._cancel_optimistic_timeout()
+
+    @callback
+    def _async_optimistic_timeout(self, _now: datetime) -> None:
+        """Roll back the optimistic attributes the server did not confirm."""
+        self._unsub_optimistic_timeout = None
+        self._optimistic_state.clear()
+        self.hass.async_create_task(self.async_flush_update())
+
+    @callback
+    def _cancel_optimistic_timeout(self) -> None:
+        """Cancel the timeout of the optimistic attributes."""
+        if self._unsub_optimistic_timeout is not None:
+            self._unsub_optimistic_timeout()
+            self._unsub_optimistic_timeout = None
 
     @catch_musicassistant_error
     async def async_media_play(self) -> None:
         """Send play command to device."""
-        await self.mass.players.player_command_play(self.player_id)
+        async with self._optimistic(state=MediaPlayerState.PLAYING):
+            await self._async_send_command(
+                self.mass.players.player_command_play, self.player_id
+            )
 
     @catch_musicassistant_error
     async def async_media_pause(self) -> None:
         """Send pause command to device."""
-        await self.mass.players.player_command_pause(self.player_id)
+        async with self._optimistic(state=MediaPlayerState.PAUSED):
+            await self._async_send_command(
+                self.mass.players.player_command_pause, self.player_id
+            )
 
     @catch_musicassistant_error
     async def async_media_stop(self) -> None:
         """Send stop command to device."""
-        await self.mass.players.player_command_stop(self.player_id)
+        async with self._optimistic(state=MediaPlayerState.IDLE):
+            await self._async_send_command(
+                self.mass.players.player_command_stop, self.player_id
+            )
 
     @catch_musicassistant_error
     async def async_media_next_track(self) -> None:
         """Send next track command to device."""
-        await self.mass.players.player_command_next_track(self.player_id)
+        await self._async_send_command(
+            self.mass.players.player_command_next_track, self.player_id
+        )
 
     @catch_musicassistant_error
     async def async_media_previous_track(self) -> None:
         """Send previous track command to device."""
-        await self.mass.players.player_command_previous_track(self.player_id)
+        await self._async_send_command(
+            self.mass.players.player_command_previous_track, self.player_id
+        )
 
     @catch_musicassistant_error
     async def async_media_seek(self, position: float) -> None:
         """Send seek command."""
         position = int(position)
-        await self.mass.players.player_command_seek(self.player_id, position)
+        # when scrubbing only the latest position is sent
+        await self._async_send_command(
+            self.mass.players.player_command_seek,
+            self.player_id,
+            position,
+            coalesce_key="seek",
+        )
 
     @catch_musicassistant_error
     async def async_mute_volume(self, mute: bool) -> None:
         """Mute the volume."""
-        await self.mass.players.player_command_volume_mute(self.player_id, mute)
+        async with self._optimistic(is_volume_muted=mute):
+            await self._async_send_command(
+                self.mass.players.player_command_volume_mute, self.player_id, mute
+            )
 
     @catch_musicassistant_error
     async def async_set_volume_level(self, volume: float) -> None:
         """Send new volume_level to device."""
         volume = int(volume * 100)
-        await self.mass.players.player_command_volume_set(self.player_id, volume)
+        # when dragging the volume slider only the latest volume is sent
+        async with self._optimistic(volume_level=volume / 100):
+            await self._async_send_command(
+                self.mass.players.player_command_volume_set,
+                self.player_id,
+                volume,
+                coalesce_key="volume_set",
+            )
 
     @catch_musicassistant_error
     async def async_volume_up(self) -> None:
         """Send new volume_level to device."""
-        await self.mass.players.player_command_volume_up(self.player_id)
+        await self._async_send_command(
+            self.mass.players.player_command_volume_up, self.player_id
+        )
 
     @catch_musicassistant_error
     async def async_volume_down(self) -> None:
         """Send new volume_level to device."""
-        await self.mass.players.player_command_volume_down(self.player_id)
+        await self._async_send_command(
+            self.mass.players.player_command_volume_down, self.player_id
+        )
 
     @catch_musicassistant_error
     async def async_turn_on(self) -> None:
         """Turn on device."""
-        await self.mass.players.player_command_power(self.player_id, True)
+        await self._async_send_command(
+            self.mass.players.player_command_power, self.player_id, True
+        )
 
     @catch_musicassistant_error
     async def async_turn_off(self) -> None:
         """Turn off device."""
-        await self.mass.players.player_command_power(self.player_id, False)
+        await self._async_send_command(
+            self.mass.players.player_command_power, self.player_id, False
+        )
 
     @catch_musicassistant_error
     async def async_set_shuffle(self, shuffle: bool) -> None:
         """Set shuffle state."""
         if not self.active_queue:
             return
-        await self.mass.player_queues.queue_command_shuffle(
-            self.active_queue.queue_id, shuffle
-        )
+        async with self._optimistic(shuffle=shuffle):
+            await self._async_send_queue_command(
+                self.mass.player_queues.queue_command_shuffle,
+                self.active_queue.queue_id,
+                shuffle,
+            )
 
     @catch_musicassistant_error
     async def async_set_repeat(self, repeat: RepeatMode) -> None:
         """Set repeat state."""
         if not self.active_queue:
             return
-        await self.mass.player_queues.queue_command_repeat(
-            self.active_queue.queue_id, MassRepeatMode(repeat)
-        )
+        async with self._optimistic(repeat=repeat):
+            await self._async_send_queue_command(
+                self.mass.player_queues.queue_command_repeat,
+                self.active_queue.queue_id,
+                MassRepeatMode(repeat),
+            )
 
     @catch_musicassistant_error
     async def async_clear_playlist(self) -> None:
@@ -378,7 +711,9 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
         if TYPE_CHECKING:
             assert self.player.active_source is not None
         if queue := self.mass.player_queues.get(self.player.active_source):
-            await self.mass.player_queues.queue_command_clear(queue.queue_id)
+            await self._async_send_queue_command(
+                self.mass.player_queues.queue_command_clear, queue.queue_id
+            )
 
     @catch_musicassistant_error
     async def async_play_media(
@@ -392,14 +727,10 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
         """Send the play_media command to the media player."""
         if media_source.is_media_source_id(media_id):
             # Handle media_source
-            sourced_media = await media_source.async_resolve_media(
-                self.hass, media_id, self.entity_id
-            )
-            media_id = sourced_media.url
-            media_id = async_process_play_media_url(self.hass, media_id)
+            media_id = await self._async_resolve_media_source(media_id)
 
         if announce:
-            await self._async_handle_play_announcement(
+            await self._async_play_announcement(
                 media_id,
                 use_pre_announce=kwargs[ATTR_MEDIA_EXTRA].get("use_pre_announce"),
                 announce_volume=kwargs[ATTR_MEDIA_EXTRA].get("announce_volume"),
@@ -407,7 +738,7 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
             return
 
         # forward to our advanced play_media handler
-        await self._async_handle_play_media(
+        await self._async_play_media_ids(
             media_id=[media_id],
             enqueue=enqueue,
             media_type=media_type,
@@ -417,19 +748,13 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
     @catch_musicassistant_error
     async def async_join_players(self, group_members: list[str]) -> None:
         """Join `group_members` as a player group with the current player."""
-        player_ids: list[str] = []
-        entity_registry = er.async_get(self.hass)
-        for child_entity_id in group_members:
-            # resolve HA entity_id to MA player_id
-            if (hass_state := self.hass.states.get(child_entity_id)) is None:
-                continue
-            if (not hass_state.attributes.get(ATTR_MASS_PLAYER_TYPE)) is None:
-                continue
-            if not (entity_reg_entry := entity_registry.async_get(child_entity_id)):
-                # can not happen, but guard for typing
-                continue
-            # unique id is the player_id
-            player_ids.append(entity_reg_entry.unique_id[5:])
+        # resolve HA entity_id's to MA player_id's
+        player_entity_index = self.entry_data.player_entity_index
+        player_ids: list[str] = [
+            player_id
+            for child_entity_id in group_members
+            if (player_id := player_entity_index.get_player_id(child_entity_id))
+        ]
         await self.mass.players.player_command_group_many(self.player_id, player_ids)
 
     @catch_musicassistant_error
@@ -459,37 +784,73 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
         enqueue: MediaPlayerEnqueue | QueueOption | None = None,
         radio_mode: bool | None = None,
         media_type: str | None = None,
-    ) -> None:
+    ) -> ServiceResponse:
+        """Handle play_media_advanced action."""
+        return await self._async_play_media_ids(
+            media_id, artist, album, enqueue, radio_mode, media_type
+        )
+
+    async def _async_play_media_ids(
+        self,
+        media_id: list[str],
+        artist: str | None = None,
+        album: str | None = None,
+        enqueue: MediaPlayerEnqueue | QueueOption | None = None,
+        radio_mode: bool | None = None,
+        media_type: str | None = None,
+    ) -> ServiceResponse:
         """Send the play_media command to the media player."""
+        # check all candidate local files at once, before any lookup on the server
+        local_files = await self.entry_data.local_file_cache.async_is_file(
+            [
+                media_id_str
+                for media_id_str in media_id
+                if "://" not in media_id_str
+                and not (media_type and media_id_str.isnumeric())
+            ]
+        )
+        # work out (all) uri(s) to play, concurrently but in the original order
+        semaphore = asyncio.Semaphore(PLAY_MEDIA_RESOLVE_CONCURRENCY)
+
+        async def resolve(media_id_str: str) -> str | None:
+            if local_files.get(media_id_str):
+                return media_id_str
+            async with semaphore:
+                return await self._async_resolve_media_id(
+                    media_id_str, artist, album, media_type
+                )
+
+        tasks = [
+            asyncio.create_task(resolve(media_id_str)) for media_id_str in media_id
+        ]
+        pending: set[asyncio.Task[str | None]] = set()
+        try:
+            if tasks:
+                _, pending = await asyncio.wait(
+                    tasks, timeout=PLAY_MEDIA_RESOLVE_TIMEOUT
+                )
+        finally:
+            # the deadline passed (or the call was cancelled)
+            for task in tasks:
+                task.cancel()
         media_uris: list[str] = []
-        item: MediaItemType | ItemMapping | None = None
-        # work out (all) uri(s) to play
-        for media_id_str in media_id:
-            # URL or URI string
-            if "://" in media_id_str:
-                media_uris.append(media_id_str)
-                continue
-            # try content id as library id
-            if media_type and media_id_str.isnumeric():
-                with suppress(MediaNotFoundError):
-                    item = await self.mass.music.get_item(
-                        MediaType(media_type), media_id_str, "library"
-                    )
-                    if isinstance(item, MediaItemType | ItemMapping) and item.uri:
-                        media_uris.append(item.uri)
+        unresolved: list[str] = []
+        error: BaseException | None = None
+        for media_id_str, task in zip(media_id, tasks, strict=True):
+            if task in pending:
+                LOGGER.debug("Resolving %s timed out", media_id_str)
+            elif (err := task.exception()) is not None:
+                if not isinstance(err, MediaNotFoundError):
+                    # e.g. connection errors, fail the call
+                    error = error or err
                     continue
-            # try local accessible filename
-            elif await asyncio.to_thread(os.path.isfile, media_id_str):
-                media_uris.append(media_id_str)
+                LOGGER.debug("Unable to resolve %s: %s", media_id_str, err)
+            elif uri := task.result():
+                media_uris.append(uri)
                 continue
-            # last resort: search for media item by name/search
-            if item := await self.mass.music.get_item_by_name(
-                name=media_id_str,
-                artist=artist,
-                album=album,
-                media_type=MediaType(media_type) if media_type else None,
-            ):
-                media_uris.append(item.uri)
+            unresolved.append(media_id_str)
+        if error is not None:
+            raise error
 
         if not media_uris:
             raise HomeAssistantError(
@@ -510,6 +871,56 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
             option=self._convert_queueoption_to_media_player_enqueue(enqueue),
             radio_mode=radio_mode if radio_mode else False,
         )
+        return cast(ServiceResponse, {"media": media_uris, "unresolved": unresolved})
+
+    async def _async_resolve_media_source(self, media_id: str) -> str:
+        """Resolve a media source id to a playable url (cached for a short while)."""
+        media_source_cache = self.entry_data.media_source_cache
+        if (url := media_source_cache.get(media_id, self.entity_id)) is None:
+            sourced_media = await media_source.async_resolve_media(
+                self.hass, media_id, self.entity_id
+            )
+            url = async_process_play_media_url(self.hass, sourced_media.url)
+            media_source_cache.set(media_id, self.entity_id, url)
+        return url
+
+    async def _async_resolve_media_id(
+        self,
+        media_id: str,
+        artist: str | None = None,
+        album: str | None = None,
+        media_type: str | None = None,
+    ) -> str | None:
+        """Resolve a media id (uri, library id or name) to a playable uri."""
+        # URL or URI string
+        if "://" in media_id:
+            return media_id
+        item: MediaItemType | ItemMapping | None = None
+        # try content id as library id
+        if media_type and media_id.isnumeric():
+            with suppress(MediaNotFoundError):
+                item = await self.mass.music.get_item(
+                    MediaType(media_type), media_id, "library"
+                )
+                if isinstance(item, MediaItemType | ItemMapping):
+                    library_uri: str | None = item.uri
+                    return library_uri
+                return None
+        # last resort: search for media item by name/search
+        mass_media_type = MediaType(media_type) if media_type else None
+        if (library_index := self.entry_data.library_index) and (
+            uri := library_index.resolve(media_id, artist, album, mass_media_type)
+        ):
+            return uri
+        if item := await self.entry_data.media_name_cache.async_get_item_by_name(
+            name=media_id,
+            artist=artist,
+            album=album,
+            media_type=mass_media_type,
+        ):
+            name_uri: str | None = item.uri
+            return name_uri
+        return None
 
     @catch_musicassistant_error
     async def _async_handle_play_announcement(
@@ -517,10 +928,22 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
         url: str,
         use_pre_announce: bool | None = None,
         announce_volume: int | None = None,
+    ) -> None:
+        """Handle play_announcement action."""
+        await self._async_play_announcement(url, use_pre_announce, announce_volume)
+
+    async def _async_play_announcement(
+        self,
+        url: str,
+        use_pre_announce: bool | None = None,
+        announce_volume: int | None = None,
     ) -> None:
         """Send the play_announcement command to the media player."""
         await self.mass.players.play_announcement(
-            self.player_id, url, use_pre_announce, announce_volume
+            self.player_id,
+            url,
+            use_pre_announce,
+            announce_volume,
         )
 
     @catch_musicassistant_error
@@ -540,38 +963,94 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
                 )
         else:
             # resolve HA entity_id to MA player_id
-            if (hass_state := self.hass.states.get(source_player)) is None:
-                return  # guard
-            entity_registry = er.async_get(self.hass)
-            if (entity := entity_registry.async_get(hass_state.entity_id)) is None:
+            player_entity_index = self.entry_data.player_entity_index
+            if (
+                source_queue_id := player_entity_index.get_player_id(source_player)
+            ) is None:
                 return  # guard
-            source_queue_id = entity.unique_id.split("mass_", 1)[1]
         target_queue_id = self.player_id
         await self.mass.player_queues.transfer_queue(
-            source_queue_id, target_queue_id, auto_play
+            source_queue_id,
+            target_queue_id,
+            auto_play,
         )
 
+    async def _async_handle_bulk_player_command(
+        self,
+        command: str,
+        volume_level: float | None = None,
+        is_volume_muted: bool | None = None,
+    ) -> ServiceResponse:
+        """Handle bulk_player_command action, report the result of this player."""
+        commands: dict[str, Callable[[], Awaitable[None]]] = {
+            "play": self.async_media_play,
+            "pause": self.async_media_pause,
+            "stop": self.async_media_stop,
+            "turn_on": self.async_turn_on,
+            "turn_off": self.async_turn_off,
+            "volume_set": functools.partial(
+                self.async_set_volume_level, cast(float, volume_level)
+            ),
+            "volume_mute": functools.partial(
+                self.async_mute_volume, cast(bool, is_volume_muted)
+            ),
+        }
+        if (
+            feature := BULK_PLAYER_COMMAND_FEATURES.get(command)
+        ) and feature not in self.player.supported_features:
+            return {"success": False, "error": f"{command} is not supported"}
+        # the entities of the action are called at once, limit the load on the server
+        async with self.entry_data.bulk_command_semaphore:
+            try:
+                await commands[command]()
+            except HomeAssistantError as err:
+                return {"success": False, "error": str(err)}
+        return {"success": True}
+
     @catch_musicassistant_error
-    async def _async_handle_get_queue(self) -> ServiceResponse:
+    async def _async_handle_get_queue(
+        self,
+        offset: int | None = None,
+        limit: int | None = None,
+        around_current: int | None = None,
+    ) -> ServiceResponse:
         """Handle get_queue action."""
-        if not self.active_queue:
+        if not (queue := self.active_queue):
             raise HomeAssistantError("No active queue found")
-        return cast(ServiceResponse, self.active_queue.to_dict())
+        response = queue.to_dict()
+        if offset is None and limit is None and around_current is None:
+            return cast(ServiceResponse, response)
+        # only fetch the requested window of the (possibly huge) queue
+        if around_current is not None:
+            current_index = queue.current_index or 0
+            offset = max(current_index - around_current, 0)
+            limit = current_index + around_current + 1 - offset
+        else:
+            offset = offset or 0
+            limit = limit or GET_QUEUE_DEFAULT_ITEMS
+        queue_items = await self.mass.player_queues.get_player_queue_items(
+            queue.queue_id, limit=limit, offset=offset
+        )
+        response[ATTR_QUEUE_ITEMS] = [
+            compact_queue_item(self.mass, item, index)
+            for index, item in enumerate(queue_items, offset)
+        ]
+        return cast(ServiceResponse, response)
 
     def _update_media_image_url(
         self, player: Player, queue: PlayerQueue | None
     ) -> None:
         """Update image URL for the active queue item."""
-        if queue is None or queue.current_item is None:
+        if queue is None or not (
+            media_attributes := self.entry_data.queue_media_cache.get(queue)
+        ):
             self._attr_media_image_url = None
             return
-        if image_url := self.mass.get_media_item_image_url(queue.current_item):
+        if media_attributes.media_image_url:
             self._attr_media_image_remotely_accessible = (
-                self.mass.server_url not in image_url
+                media_attributes.media_image_remotely_accessible
             )
-            self._attr_media_image_url = image_url
-            return
-        self._attr_media_image_url = None
+        self._attr_media_image_url = media_attributes.media_image_url
 
     def _update_media_attributes(
         self, player: Player, queue: PlayerQueue | None
@@ -606,9 +1085,6 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
                 if player.elapsed_time_last_updated
                 else None
             )
-            if TYPE_CHECKING:
-                assert player.elapsed_time is not None
-            self._prev_time = player.elapsed_time
             return
 
         if queue is None:
@@ -621,48 +1097,21 @@ class MusicAssistantPlayer(MusicAssistantBaseEntity, MediaPlayerEntity):
         self._attr_app_id = DOMAIN
         self._attr_shuffle = queue.shuffle_enabled
         self._attr_repeat = queue.repeat_mode.value
-        if not (cur_item := queue.current_item):
+        if not queue.current_item:
             # queue is empty
             return
 
-        self._attr_media_content_id = queue.current_item.uri
-        self._attr_media_duration = queue.current_item.duration
-        self._attr_media_position = int(queue.elapsed_time)
-        self._attr_media_position_updated_at = utc_from_timestamp(
-            queue.elapsed_time_last_updated
-        )
-        self._prev_time = queue.elapsed_time
-
-        # handle stream title (radio station icy metadata)
-        if (stream_details := cur_item.streamdetails) and stream_details.stream_title:
-            self._attr_media_album_name = cur_item.name
-            if " - " in stream_details.stream_title:
-                stream_title_parts = stream_details.stream_title.split(" - ", 1)
-                self._attr_media_title = stream_title_parts[1]
-                self._attr_media_artist = stream_title_parts[0]
-            else:
-                self._attr_media_title = stream_details.stream_title
-            return
-
-        if not (media_item := cur_item.media_item):
-            # queue is not playing a regular media item (edge case?!)
-            self._attr_media_title = cur_item.name
-            return
-
-        # queue is playing regular media item
-        self._attr_media_title = media_item.name
-        # for tracks we can extract more info
-        if media_item.media_type == MediaType.TRACK:
-            if TYPE_CHECKING:
-                assert isinstance(media_item, Track)
-            self._attr_media_artist = media_item.artist_str
-            if media_item.version:
-                self._attr_media_title += f" ({media_item.version})"
-            if media_item.album:
-                self._attr_media_album_name = media_item.album.name
-                self._attr_media_album_artist = getattr(
-                    media_item.album, "artist_str", None
-                )
+        position = self.entry_data.queue_router.async_get_position(queue)
+        self._attr_media_position = int(position.elapsed_time)
+        self._attr_media_position_updated_at = position.updated_at
+        # the media attributes are shared by all players following this queue
+        if media_attributes := self.entry_data.queue_media_cache.get(queue):
+            self._attr_media_content_id = media_attributes.media_content_id
+            self._attr_media_duration = media_attributes.media_duration
+            self._attr_media_title = media_attributes.media_title
+            self._attr_media_artist = media_attributes.media_artist
+            self._attr_media_album_name = media_attributes.media_album_name
+            self._attr_media_album_artist = media_attributes.media_album_artist
 
     def _convert_queueoption_to_media_player_enqueue(
         self, queue_option: MediaPlayerEnqueue | QueueOption | None
@@ -0,0 +1,126 @@
+"""Lightweight instrumentation of the Music Assistant integration."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from music_assistant_client import MusicAssistantClient
+
+# upper bounds (in seconds) of the latency buckets, the last bucket is open-ended
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass(slots=True)
+class SetupTimings:
+    """Monotonic timings (in seconds) of the phases of the entry setup.
+
+    Phases that run more than once (e.g. per entity) are summed.
+    """
+
+    phases: dict[str, float] = field(default_factory=dict)
+    initial_state: dict[str, int] = field(default_factory=dict)
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """Measure the duration of a setup phase."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[phase] = self.phases.get(phase, 0.0) + (
+                time.monotonic() - start
+            )
+
+    def record_initial_state(self, mass: MusicAssistantClient) -> None:
+        """Record the number of items of the initial state fetched from the server."""
+        self.initial_state = {
+            "providers": len(mass.providers),
+            "players": len(mass.players.players),
+            "queues": len(mass.player_queues.player_queues),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the timings as a (diagnostics) dict."""
+        return {
+            "phases": {phase: round(value, 4) for phase, value in self.phases.items()},
+            "initial_state": self.initial_state,
+        }
+
+
+@dataclass(slots=True)
+class LatencyHistogram:
+    """Fixed-bucket histogram of command latencies."""
+
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    count: int = 0
+    errors: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def record(self, duration: float, error: bool) -> None:
+        """Record the duration (in seconds) of a command."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        if error:
+            self.errors += 1
+
+    def merge(self, other: LatencyHistogram) -> None:
+        """Add the counts of another histogram to this one."""
+        for idx, value in enumerate(other.buckets):
+            self.buckets[idx] += value
+        self.count += other.count
+        self.errors += other.errors
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram as a (diagnostics) dict."""
+        labels = [f"le_{bound}" for bound in LATENCY_BUCKETS] + ["inf"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean": round(self.total / self.count, 4) if self.count else None,
+            "max": round(self.max, 4),
+            "buckets": dict(zip(labels, self.buckets, strict=True)),
+        }
+
+
+class CommandMetrics:
+    """Latency histograms of the player commands, per command and player."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self._histograms: dict[str, dict[str, LatencyHistogram]] = {}
+
+    def record(
+        self, command: str, player_id: str, duration: float, error: bool
+    ) -> None:
+        """Record the duration (in seconds) of a command sent to a player."""
+        players = self._histograms.setdefault(command, {})
+        if (histogram := players.get(player_id)) is None:
+            histogram = players[player_id] = LatencyHistogram()
+        histogram.record(duration, error)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histograms as a (diagnostics) dict."""
+        result: dict[str, Any] = {}
+        for command, players in self._histograms.items():
+            total = LatencyHistogram()
+            for histogram in players.values():
+                total.merge(histogram)
+            result[command] = {
+                **total.as_dict(),
+                "players": {
+                    player_id: histogram.as_dict()
+                    for player_id, histogram in players.items()
+                },
+            }
+        return result
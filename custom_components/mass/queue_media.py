@@ -0,0 +1,144 @@
+"""Shared projection of the current item of a player queue into media attributes."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from music_assistant_models.enums import EventType, MediaType
+from music_assistant_models.media_items import Track
+
+if TYPE_CHECKING:
+    from music_assistant_client import MusicAssistantClient
+
+    from .connection import MusicAssistantConnection
+    from music_assistant_models.event import MassEvent
+    from music_assistant_models.player_queue import PlayerQueue
+    from music_assistant_models.queue_item import QueueItem
+
+
+@dataclass(slots=True, frozen=True)
+class QueueMediaAttributes:
+    """HA media attributes of the current item of a player queue."""
+
+    media_content_id: str | None
+    media_duration: int | None
+    media_title: str | None
+    media_artist: str | None
+    media_album_name: str | None
+    media_album_artist: str | None
+    media_image_url: str | None
+    media_image_remotely_accessible: bool
+
+
+class QueueMediaAttributesCache:
+    """Memoize the media attributes of the current item per queue.
+
+    All players following the same (group) queue share the projection.
+    It is bound to the current item (object) of the queue, which the client
+    replaces on every QUEUE_UPDATED, so in place updates of the metadata or
+    stream title of the same queue item are picked up as well.
+    """
+
+    def __init__(self, connection: MusicAssistantConnection) -> None:
+        """Initialize the cache."""
+        self.connection = connection
+        self._cache: dict[str, tuple[QueueItem, QueueMediaAttributes]] = {}
+
+    @property
+    def mass(self) -> MusicAssistantClient:
+        """Return the current client."""
+        return self.connection.client
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Start evicting removed queues, return function to stop."""
+        # the queue of a player has the id of the player
+        return self.connection.subscribe(
+            self._on_player_removed, EventType.PLAYER_REMOVED
+        )
+
+    @callback
+    def get(self, queue: PlayerQueue) -> QueueMediaAttributes | None:
+        """Return the media attributes for the current item of the queue."""
+        if (cur_item := queue.current_item) is None:
+            self._cache.pop(queue.queue_id, None)
+            return None
+        if (cached := self._cache.get(queue.queue_id)) and cached[0] is cur_item:
+            return cached[1]
+        stream_title = (
+            cur_item.streamdetails.stream_title if cur_item.streamdetails else None
+        )
+        media_attributes = self._build(cur_item, stream_title)
+        self._cache[queue.queue_id] = (cur_item, media_attributes)
+        return media_attributes
+
+    @callback
+    def _on_player_removed(self, event: MassEvent) -> None:
+        """Drop the attributes of the queue of a removed player."""
+        if event.object_id is not None:
+            self._cache.pop(event.object_id, None)
+
+    def _build(
+        self, cur_item: QueueItem, stream_title: str | None
+    ) -> QueueMediaAttributes:
+        """Build the media attributes for a queue item."""
+        title: str | None = cur_item.name
+        artist: str | None = None
+        album_name: str | None = None
+        album_artist: str | None = None
+        if stream_title:
+            # handle stream title (radio station icy metadata)
+            album_name = cur_item.name
+            if " - " in stream_title:
+                artist, title = stream_title.split(" - ", 1)
+            else:
+                title = stream_title
+        elif media_item := cur_item.media_item:
+            # queue is playing regular media item
+            title = media_item.name
+            # for tracks we can extract more info
+            if media_item.media_type == MediaType.TRACK:
+                if TYPE_CHECKING:
+                    assert isinstance(media_item, Track)
+                artist = media_item.artist_str
+                if media_item.version:
+                    title = f"{media_item.name} ({media_item.version})"
+                if media_item.album:
+                    album_name = media_item.album.name
+                    album_artist = getattr(media_item.album, "artist_str", None)
+
+        image_url = self.mass.get_media_item_image_url(cur_item)
+        return QueueMediaAttributes(
+            media_content_id=cur_item.uri,
+            media_duration=cur_item.duration,
+            media_title=title,
+            media_artist=artist,
+            media_album_name=album_name,
+            media_album_artist=album_artist,
+            media_image_url=image_url,
+            media_image_remotely_accessible=(
+                image_url is None or self.mass.server_url not in image_url
+            ),
+        )
+
+
+def compact_queue_item(
+    mass: MusicAssistantClient, item: QueueItem, index: int
+) -> dict[str, Any]:
+    """Return a compact (serializable) projection of a queue item."""
+    media_item = item.media_item
+    album = getattr(media_item, "album", None)
+    return {
+        "queue_item_id": item.queue_item_id,
+        "index": index,
+        "name": item.name,
+        "duration": item.duration,
+        "uri": item.uri,
+        "media_type": item.media_type,
+        "artist": getattr(media_item, "artist_str", None),
+        "album": album.name if album else None,
+        "image": mass.get_media_item_image_url(item),
+    }
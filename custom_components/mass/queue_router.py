@@ -0,0 +1,161 @@
+"""Route Music Assistant player queue events to the entities that render them."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Coroutine, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.util.dt import utc_from_timestamp, utcnow
+from music_assistant_models.enums import EventType, PlayerState
+
+from .const import LOGGER
+
+if TYPE_CHECKING:
+    from music_assistant_client import MusicAssistantClient
+
+    from .connection import MusicAssistantConnection
+    from music_assistant_models.event import MassEvent
+    from music_assistant_models.player_queue import PlayerQueue
+
+type QueueEventCallback = Callable[[MassEvent], Coroutine[Any, Any, None]]
+
+# deviation (in seconds) between the reported and the extrapolated
+# elapsed time of a queue that we consider a jump (e.g. seeking)
+SEEK_THRESHOLD = 5
+
+
+@dataclass(slots=True, frozen=True)
+class QueuePosition:
+    """Elapsed time of a queue at a moment in time."""
+
+    elapsed_time: float
+    updated_at: datetime
+
+
+class QueueEventRouter:
+    """Dispatch queue events to subscribers, indexed by queue_id.
+
+    A single subscription on the Music Assistant client replaces the
+    per-entity QUEUE_UPDATED and QUEUE_TIME_UPDATED listeners, so an event
+    for a queue only reaches the entities that actually render that queue.
+    """
+
+    def __init__(self, connection: MusicAssistantConnection) -> None:
+        """Initialize the router."""
+        self.connection = connection
+        self._subscribers: dict[EventType, dict[str, list[QueueEventCallback]]] = {
+            EventType.QUEUE_UPDATED: {},
+            EventType.QUEUE_TIME_UPDATED: {},
+        }
+        # positions of time jumps received since the last QUEUE_UPDATED
+        self._positions: dict[str, QueuePosition] = {}
+
+    @property
+    def mass(self) -> MusicAssistantClient:
+        """Return the current client."""
+        return self.connection.client
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Start listening for queue events, return function to stop listening."""
+        unsubs = [
+            self.connection.subscribe(self._on_queue_updated, EventType.QUEUE_UPDATED),
+            self.connection.subscribe(
+                self._on_queue_time_updated, EventType.QUEUE_TIME_UPDATED
+            ),
+        ]
+
+        @callback
+        def stop_listening() -> None:
+            for unsub in unsubs:
+                unsub()
+
+        return stop_listening
+
+    @callback
+    def async_subscribe(
+        self,
+        cb_func: QueueEventCallback,
+        queue_ids: Iterable[str],
+        event_type: EventType = EventType.QUEUE_UPDATED,
+    ) -> Callable[[], None]:
+        """Subscribe to events of the given queue(s), return unsubscribe function.
+
+        For QUEUE_TIME_UPDATED the callback is only called when the elapsed
+        time jumps (e.g. seeking), steady playback is left to the
+        media_position_updated_at extrapolation of Home Assistant.
+        """
+        subscribers = self._subscribers[event_type]
+        queue_ids = tuple(set(queue_ids))
+        for queue_id in queue_ids:
+            subscribers.setdefault(queue_id, []).append(cb_func)
+
+        @callback
+        def remove_listener() -> None:
+            for queue_id in queue_ids:
+                listeners = subscribers[queue_id]
+                listeners.remove(cb_func)
+                if not listeners:
+                    del subscribers[queue_id]
+
+        return remove_listener
+
+    @callback
+    def async_get_position(self, queue: PlayerQueue) -> QueuePosition:
+        """Return the (last known) position of a queue."""
+        if (position := self._positions.get(queue.queue_id)) is not None:
+            return position
+        return QueuePosition(
+            float(queue.elapsed_time),
+            utc_from_timestamp(queue.elapsed_time_last_updated),
+        )
+
+    async def _on_queue_updated(self, event: MassEvent) -> None:
+        """Forward a QUEUE_UPDATED event to the subscribers of that queue."""
+        if event.object_id is not None:
+            # the queue (model) holds the latest position again
+            self._positions.pop(event.object_id, None)
+        await self._async_dispatch(event)
+
+    async def _on_queue_time_updated(self, event: MassEvent) -> None:
+        """Handle a QUEUE_TIME_UPDATED event, only forward big time jumps."""
+        if event.object_id not in self._subscribers[EventType.QUEUE_TIME_UPDATED]:
+            return
+        if (queue := self.mass.player_queues.get(event.object_id)) is None:
+            return
+        elapsed_time = float(event.data)
+        if abs(self._extrapolated_elapsed_time(queue) - elapsed_time) <= SEEK_THRESHOLD:
+            return
+        # the client only refreshes the queue on QUEUE_UPDATED so we keep the
+        # new position to extrapolate from this point onwards
+        self._positions[queue.queue_id] = QueuePosition(elapsed_time, utcnow())
+        await self._async_dispatch(event)
+
+    def _extrapolated_elapsed_time(self, queue: PlayerQueue) -> float:
+        """Return the elapsed time of the queue we expect at this moment."""
+        if (position := self._positions.get(queue.queue_id)) is None:
+            if queue.state == PlayerState.PLAYING:
+                return float(queue.corrected_elapsed_time)
+            return float(queue.elapsed_time)
+        if queue.state == PlayerState.PLAYING:
+            return (
+                position.elapsed_time + (utcnow() - position.updated_at).total_seconds()
+            )
+        return position.elapsed_time
+
+    async def _async_dispatch(self, event: MassEvent) -> None:
+        """Call the subscribers of the event's queue."""
+        if event.object_id is None:
+            return
+        subscribers = self._subscribers[event.event]
+        # copy the list as subscribers may (re)subscribe while being called
+        for cb_func in tuple(subscribers.get(event.object_id, ())):
+            try:
+                await cb_func(event)
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception(
+                    "Error handling %s for %s", event.event, event.object_id
+                )
@@ -0,0 +1,136 @@
+"""Persist the last known Music Assistant state to allow a warm start."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, TypedDict
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from music_assistant_models.player import Player
+
+from .const import DOMAIN, LOGGER, SIGNAL_CONNECTION_STATE
+from .helpers import async_remove_player_device
+
+if TYPE_CHECKING:
+    from music_assistant_client import MusicAssistantClient
+
+    from .connection import MusicAssistantConnection
+
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_INTERVAL = timedelta(minutes=15)
+
+
+class StateSnapshot(TypedDict):
+    """Last known state of the Music Assistant players."""
+
+    players: list[dict[str, Any]]
+
+
+class StateSnapshotStore:
+    """Save and restore the last known player state.
+
+    The snapshot is saved on shutdown and on a timer. At setup the entities
+    are created (unavailable) from the restored players, so the setup does
+    not have to wait for the client to connect and sync. The entities switch
+    to the live players once the client has synced.
+
+    Only the players are saved: a restored entity is unavailable, so it
+    renders no queue (media) state.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        connection: MusicAssistantConnection,
+    ) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self.connection = connection
+        self._store = _get_store(hass, entry_id)
+        # players of the snapshot, until the client has synced
+        self.restored_players: dict[str, Player] = {}
+
+    @property
+    def mass(self) -> MusicAssistantClient:
+        """Return the current client."""
+        return self.connection.client
+
+    async def async_restore(self) -> bool:
+        """Load the saved players, return True if restored."""
+        try:
+            snapshot = await self._store.async_load()
+            if not snapshot or not snapshot["players"]:
+                return False
+            for player_dict in snapshot["players"]:
+                player = Player.from_dict(player_dict)
+                self.restored_players[player.player_id] = player
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.exception("Unable to load the Music Assistant state snapshot")
+            self.restored_players.clear()
+            return False
+        LOGGER.debug(
+            "Restored %s players from the Music Assistant state snapshot",
+            len(self.restored_players),
+        )
+        return True
+
+    @callback
+    def async_setup(self) -> Callable[[], None]:
+        """Start saving periodically, return function to stop."""
+        unsubs = [
+            async_track_time_interval(
+                self.hass, self._async_save_interval, SNAPSHOT_SAVE_INTERVAL
+            ),
+            # connect before the entities do so stale players are pruned first
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_CONNECTION_STATE.format(self.entry_id),
+                self._async_prune_stale,
+            ),
+        ]
+
+        @callback
+        def stop() -> None:
+            for unsub in unsubs:
+                unsub()
+
+        return stop
+
+    async def async_save(self) -> None:
+        """Save the current state (if we have a live and synced connection)."""
+        if not self.connection.synced.is_set() or not self.mass.connection.connected:
+            return
+        if not (players := [player.to_dict() for player in self.mass.players]):
+            return
+        await self._store.async_save({"players": players})
+
+    async def _async_save_interval(self, now: datetime) -> None:
+        """Save the state on the interval."""
+        await self.async_save()
+
+    @callback
+    def _async_prune_stale(self) -> None:
+        """Remove the restored players the server no longer knows about."""
+        if not self.connection.synced.is_set() or not self.restored_players:
+            return
+        for player_id in self.restored_players:
+            if self.mass.players.get(player_id) is None:
+                LOGGER.debug("Removing stale player %s", player_id)
+                async_remove_player_device(self.hass, self.entry_id, player_id)
+        self.restored_players.clear()
+
+
+def _get_store(hass: HomeAssistant, entry_id: str) -> Store[StateSnapshot]:
+    """Return the store for the state snapshot of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.state_snapshot.{entry_id}")
+
+
+async def async_remove_state_snapshot(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the state snapshot of a config entry from storage."""
+    await _get_store(hass, entry_id).async_remove()
@@ -0,0 +1,195 @@
+"""Tests for the Music Assistant actions."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import voluptuous as vol
+from homeassistant.exceptions import HomeAssistantError
+from music_assistant_client.exceptions import InvalidState
+from music_assistant_models.enums import MediaType
+from music_assistant_models.errors import MusicAssistantError
+from music_assistant_models.media_items import (
+    ItemMapping,
+    ProviderMapping,
+    SearchResults,
+    Track,
+)
+
+from custom_components.mass import actions
+from custom_components.mass.actions import (
+    async_fetch_library,
+    decode_library_cursor,
+    encode_library_cursor,
+    project_media_item,
+    register_get_library_action,
+    register_search_many_action,
+)
+from custom_components.mass.const import DOMAIN
+
+QUERY = {
+    "favorite": None,
+    "search": None,
+    "order_by": "name",
+    "album_type": None,
+    "album_artists_only": None,
+}
+
+TRACK_MAPPING = {
+    "item_id": "1",
+    "provider": "library",
+    "name": "We Will Rock You",
+    "uri": "library://track/1",
+    "media_type": "track",
+}
+
+
+def _library(size: int) -> AsyncMock:
+    """Return a (mocked) get_library_tracks for a library of a size."""
+
+    async def get_library_tracks(limit: int, offset: int, **kwargs) -> list:
+        items = []
+        for index in range(offset, min(offset + limit, size)):
+            item = MagicMock()
+            item.to_dict.return_value = {"item_id": str(index)}
+            items.append(item)
+        return items
+
+    return AsyncMock(side_effect=get_library_tracks)
+
+
+def test_library_cursor():
+    """Test a cursor only continues the query it was created for."""
+    cursor = encode_library_cursor(500, MediaType.TRACK, QUERY)
+    assert decode_library_cursor(cursor, MediaType.TRACK, QUERY) == 500
+    with pytest.raises(HomeAssistantError, match="does not belong"):
+        decode_library_cursor(cursor, MediaType.TRACK, {**QUERY, "order_by": None})
+    with pytest.raises(HomeAssistantError, match="Invalid cursor"):
+        decode_library_cursor("garbage", MediaType.TRACK, QUERY)
+
+
+async def test_fetch_library(monkeypatch: pytest.MonkeyPatch):
+    """Test the library is paged through in order, up to the maximum."""
+    monkeypatch.setattr(actions, "LIBRARY_PAGE_SIZE", 10)
+    mass = MagicMock()
+    mass.music.get_library_tracks = _library(95)
+
+    items, has_more = await async_fetch_library(mass, MediaType.TRACK, QUERY, 5, 60)
+    assert [item["item_id"] for item in items] == [str(i) for i in range(5, 65)]
+    assert has_more
+
+    items, has_more = await async_fetch_library(mass, MediaType.TRACK, QUERY, 65, 60)
+    assert [item["item_id"] for item in items] == [str(i) for i in range(65, 95)]
+    assert not has_more
+
+
+def test_project_media_item():
+    """Test only the requested fields of a media item are returned."""
+    track = Track(
+        item_id="1",
+        provider="library",
+        name="We Will Rock You",
+        uri="library://track/1",
+        provider_mappings={
+            ProviderMapping(
+                item_id="1", provider_domain="spotify", provider_instance="spotify"
+            )
+        },
+        artists=[
+            ItemMapping(
+                item_id="1",
+                provider="library",
+                name="Queen",
+                media_type=MediaType.ARTIST,
+            )
+        ],
+    )
+    mass = MagicMock()
+    mass.get_media_item_image_url.return_value = "http://mass/imageproxy"
+    assert project_media_item(mass, track, ["uri", "name", "artist", "media_type"]) == {
+        "uri": "library://track/1",
+        "name": "We Will Rock You",
+        "artist": "Queen",
+        "media_type": MediaType.TRACK,
+    }
+    assert project_media_item(mass, track, ["album", "unknown", "__class__"]) == {
+        "album": None,
+        "unknown": None,
+        "__class__": None,
+    }
+    track.album = ItemMapping(
+        item_id="1",
+        provider="library",
+        name="News of the World",
+        media_type=MediaType.ALBUM,
+    )
+    assert project_media_item(mass, track, ["album", "image"]) == {
+        "album": "News of the World",
+        "image": "http://mass/imageproxy",
+    }
+
+
+async def test_search_many(hass):
+    """Test search_many reports the result of every query in order."""
+
+    async def search(search_query: str, **kwargs) -> SearchResults:
+        if search_query == "fail":
+            raise MusicAssistantError("Search failed")
+        if search_query == "offline":
+            raise InvalidState("Not connected")
+        return SearchResults(tracks=[ItemMapping.from_dict(TRACK_MAPPING)])
+
+    entry_data = MagicMock()
+    entry_data.search_cache.async_search = AsyncMock(side_effect=search)
+    register_search_many_action(hass)
+    with patch.object(
+        actions, "get_music_assistant_entry_data", return_value=entry_data
+    ):
+        response = await hass.services.async_call(
+            DOMAIN,
+            "search_many",
+            {
+                "queries": [
+                    {"name": "Rock You", "artist": "Queen"},
+                    {"name": "fail"},
+                    {"name": "offline"},
+                ],
+                "fields": ["uri"],
+            },
+            blocking=True,
+            return_response=True,
+        )
+    assert response == {
+        "results": [
+            {
+                "success": True,
+                "artists": [],
+                "albums": [],
+                "tracks": [{"uri": "library://track/1"}],
+                "playlists": [],
+                "radio": [],
+                "audiobooks": [],
+                "podcasts": [],
+            },
+            {"success": False, "error": "Search failed"},
+            {"success": False, "error": "Not connected"},
+        ]
+    }
+    assert entry_data.search_cache.async_search.call_args_list[0].kwargs == {
+        "search_query": "Queen - Rock You",
+        "media_types": MediaType.ALL,
+        "limit": 5,
+        "library_only": False,
+    }
+
+
+async def test_get_library_cursor_and_offset(hass):
+    """Test a cursor can not be combined with an offset."""
+    register_get_library_action(hass)
+    with pytest.raises(vol.Invalid, match="can not be combined"):
+        await hass.services.async_call(
+            DOMAIN,
+            "get_library",
+            {"media_type": "track", "offset": 10, "cursor": "abc"},
+            blocking=True,
+            return_response=True,
+        )
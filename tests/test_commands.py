@@ -0,0 +1,74 @@
+"""Tests for the Music Assistant player command channel."""
+
+import asyncio
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.mass.commands import PlayerCommandChannel
+from custom_components.mass.const import DOMAIN
+
+
+async def test_latest_value_wins(hass):
+    """Test queued values of the same command are collapsed."""
+    channel = PlayerCommandChannel(hass, MockConfigEntry(domain=DOMAIN), "kitchen")
+    release = asyncio.Event()
+    sent: list[int] = []
+
+    async def volume_set(volume: int) -> None:
+        await release.wait()
+        sent.append(volume)
+
+    def set_volume(volume: int) -> asyncio.Task:
+        return asyncio.create_task(
+            channel.async_send(lambda: volume_set(volume), "volume_set")
+        )
+
+    tasks = [set_volume(10)]
+    # let the first value start sending
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    tasks.extend(set_volume(volume) for volume in (20, 30, 40))
+    await asyncio.sleep(0)
+    # one value in flight, the latest value queued
+    assert channel.depth == 2
+    release.set()
+    await asyncio.gather(*tasks)
+    # the first value was in flight, the others collapse into the latest
+    assert sent == [10, 40]
+    assert channel.depth == 0
+    assert channel.max_depth == 2
+
+
+async def test_commands_are_ordered_and_errors_raised(hass):
+    """Test commands are sent in order and errors reach the caller(s)."""
+    channel = PlayerCommandChannel(hass, MockConfigEntry(domain=DOMAIN), "kitchen")
+    sent: list[str] = []
+
+    async def command(name: str) -> None:
+        sent.append(name)
+        if name == "fail":
+            raise ValueError(name)
+
+    first = asyncio.create_task(channel.async_send(lambda: command("seek"), "seek"))
+    failed = asyncio.create_task(channel.async_send(lambda: command("fail")))
+    last = asyncio.create_task(channel.async_send(lambda: command("seek2"), "seek"))
+    await first
+    with pytest.raises(ValueError, match="fail"):
+        await failed
+    await last
+    assert sent == ["seek", "fail", "seek2"]
+
+
+async def test_worker_cancelled_on_unload(hass):
+    """Test the worker is a background task of the config entry."""
+    entry = MockConfigEntry(domain=DOMAIN)
+    channel = PlayerCommandChannel(hass, entry, "kitchen")
+    send = asyncio.create_task(channel.async_send(asyncio.Event().wait))
+    await asyncio.sleep(0)
+    assert channel.depth == 1
+
+    await entry._async_process_on_unload(hass)
+    with pytest.raises(asyncio.CancelledError):
+        await send
+    assert channel.depth == 0
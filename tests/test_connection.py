@@ -0,0 +1,60 @@
+"""Tests for the Music Assistant connection."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.helpers import issue_registry as ir
+from music_assistant_client.exceptions import CannotConnect, InvalidServerVersion
+from music_assistant_models.enums import EventType
+from music_assistant_models.event import MassEvent
+
+from custom_components.mass import connection as connection_module
+from custom_components.mass.connection import MusicAssistantConnection
+from custom_components.mass.const import DOMAIN
+
+
+async def test_reconnect_with_fresh_client(hass, monkeypatch: pytest.MonkeyPatch):
+    """Test every reconnect uses a new client and a bad server version stops it."""
+    monkeypatch.setattr(connection_module, "RECONNECT_BACKOFF_MIN", 0)
+    event = MassEvent(EventType.PLAYER_UPDATED, "kitchen", None)
+    clients: list[MagicMock] = []
+
+    def relay(client: MagicMock) -> None:
+        client.subscribe.call_args.args[0](event)
+
+    async def connection_lost(init_ready: asyncio.Event) -> None:
+        init_ready.set()
+        await asyncio.sleep(0)
+
+    async def cannot_connect(init_ready: asyncio.Event) -> None:
+        relay(clients[1])
+        raise CannotConnect(OSError())
+
+    async def invalid_version(init_ready: asyncio.Event) -> None:
+        init_ready.set()
+        await asyncio.sleep(0)
+        relay(clients[2])
+        raise InvalidServerVersion("Schema version is too old")
+
+    def new_client(*args) -> MagicMock:
+        client = MagicMock()
+        client.start_listening.side_effect = (
+            connection_lost,
+            cannot_connect,
+            invalid_version,
+        )[len(clients)]
+        clients.append(client)
+        return client
+
+    with patch.object(connection_module, "MusicAssistantClient", new_client):
+        connection = MusicAssistantConnection(hass, "1", "http://mass", MagicMock())
+        subscriber = MagicMock()
+        connection.subscribe(subscriber, EventType.PLAYER_UPDATED, "kitchen")
+        await connection.async_listen()
+
+    assert len(clients) == 3
+    assert connection.client is clients[2]
+    # only the events of the current client are forwarded
+    subscriber.assert_called_once_with(event)
+    assert ir.async_get(hass).async_get_issue(DOMAIN, "invalid_server_version")
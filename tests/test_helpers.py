@@ -0,0 +1,50 @@
+"""Tests for the Music Assistant integration helpers."""
+
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.mass.const import DOMAIN
+from custom_components.mass.helpers import PlayerEntityIndex
+
+
+async def test_player_entity_index(hass):
+    """Test the player_id <-> entity_id index follows the entity registry."""
+    config_entry = MockConfigEntry(domain=DOMAIN, entry_id="1")
+    config_entry.add_to_hass(hass)
+    entity_registry = er.async_get(hass)
+    entity_registry.async_get_or_create(
+        "media_player",
+        DOMAIN,
+        "mass_kitchen",
+        config_entry=config_entry,
+        suggested_object_id="kitchen",
+    )
+    index = PlayerEntityIndex(hass, config_entry.entry_id)
+    unsub = index.async_setup()
+    assert index.get_entity_id("kitchen") == "media_player.kitchen"
+    assert index.get_player_id("media_player.kitchen") == "kitchen"
+
+    # new entity
+    entity_registry.async_get_or_create(
+        "media_player",
+        DOMAIN,
+        "mass_living",
+        config_entry=config_entry,
+        suggested_object_id="living",
+    )
+    await hass.async_block_till_done()
+    assert index.get_entity_id("living") == "media_player.living"
+
+    # renamed entity
+    entity_registry.async_update_entity(
+        "media_player.kitchen", new_entity_id="media_player.keuken"
+    )
+    await hass.async_block_till_done()
+    assert index.get_entity_id("kitchen") == "media_player.keuken"
+    assert index.get_player_id("media_player.kitchen") is None
+
+    # removed entity
+    entity_registry.async_remove("media_player.living")
+    await hass.async_block_till_done()
+    assert index.get_entity_id("living") is None
+    unsub()
@@ -0,0 +1,138 @@
+"""Tests for the Music Assistant local library index."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+from music_assistant_models.enums import EventType, MediaType
+from music_assistant_models.event import MassEvent
+
+from custom_components.mass.library_index import (
+    LibraryIndex,
+    LibraryIndexData,
+    StoredLibraryIndex,
+)
+
+
+async def test_library_index_search():
+    """Test ranked (fuzzy) lookups in the library index."""
+    data = LibraryIndexData()
+    data.add("library://playlist/1", MediaType.PLAYLIST, "Morning Jazz", None)
+    data.add("library://radio/1", MediaType.RADIO, "BBC Radio 4", None)
+    data.add("library://track/1", MediaType.TRACK, "Jazz", None, ["Miles Davis"])
+    data.add("library://track/2", MediaType.TRACK, "Jazz", None, ["Queen"])
+
+    # exact (normalized) match
+    assert data.search("bbc  radio 4", limit=1) == [(1.0, "library://radio/1")]
+    # fuzzy match
+    score, uri = data.search("morning jaz", limit=1)[0]
+    assert uri == "library://playlist/1"
+    assert 0.8 < score < 1
+    # media type and artist filters
+    assert data.search("jazz", MediaType.TRACK, "queen") == [(1.0, "library://track/2")]
+    assert not data.search("jazz", MediaType.RADIO)
+
+    # removed and updated items
+    data.remove("library://radio/1")
+    assert not data.search("bbc radio 4")
+    data.add("library://playlist/1", MediaType.PLAYLIST, "Evening Jazz", None)
+    assert data.search("evening jazz", limit=1) == [(1.0, "library://playlist/1")]
+    assert len(data) == 3
+    # the previous position of the updated item is skipped
+    assert len(data.search("jazz", MediaType.PLAYLIST)) == 1
+
+    # saved (column-wise) and loaded again
+    stored = StoredLibraryIndex(server_id="1", built_at=0, **data.to_columns())
+    assert len(stored["uris"]) == 3
+    loaded = LibraryIndexData.from_columns(stored)
+    assert loaded.search("jazz", MediaType.TRACK, "miles davis") == [
+        (1.0, "library://track/1")
+    ]
+
+
+async def test_library_index_remove_many(hass):
+    """Test removing many items keeps the postings until the index is compacted."""
+    index = LibraryIndex(hass, "entry", MagicMock())
+    for idx in range(5000):
+        index.data.add(f"library://radio/{idx}", MediaType.RADIO, f"Radio {idx}", None)
+    postings = sum(len(posting) for posting in index.data.postings.values())
+
+    for idx in range(2500):
+        index._on_media_item_event(
+            MassEvent(EventType.MEDIA_ITEM_DELETED, f"library://radio/{idx}", None)
+        )
+    # removed items are tombstoned, the postings are left as is
+    assert sum(len(posting) for posting in index.data.postings.values()) == postings
+    matches = index.data.search("radio 1", limit=100)
+    assert "library://radio/1" not in [uri for _, uri in matches]
+    assert index.data.search("radio 2500", limit=1) == [(1.0, "library://radio/2500")]
+
+    # once the holes outnumber the items, the index is compacted in the executor
+    index._on_media_item_event(
+        MassEvent(EventType.MEDIA_ITEM_DELETED, "library://radio/2500", None)
+    )
+    assert len(index.data.uris) == 5000
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert len(index.data.uris) == len(index.data) == 2499
+    assert not index.data.removed
+    assert index.data.search("radio 4999", limit=1) == [(1.0, "library://radio/4999")]
+
+
+async def test_library_index_discard_malformed(hass, hass_storage):
+    """Test a malformed saved index is discarded, so it gets rebuilt."""
+    connection = MagicMock()
+    connection.client.server_info.server_id = "1"
+    index = LibraryIndex(hass, "entry", connection)
+    data = LibraryIndexData()
+    data.add("library://radio/1", MediaType.RADIO, "BBC Radio 4", None)
+    stored = StoredLibraryIndex(server_id="1", built_at=0, **data.to_columns())
+    stored["names"] = []
+    hass_storage["mass.library_index.entry"] = {
+        "version": 1,
+        "key": "mass.library_index.entry",
+        "data": stored,
+    }
+    await index._async_load()
+    assert not index.ready
+    assert "mass.library_index.entry" not in hass_storage
+
+
+async def test_library_index_reconcile_saved(hass, hass_storage):
+    """Test a saved index is reconciled with the deleted and renamed items."""
+    data = LibraryIndexData()
+    data.add("library://radio/1", MediaType.RADIO, "BBC Radio 4", None)
+    data.add("library://radio/2", MediaType.RADIO, "Radio 538", None)
+    hass_storage["mass.library_index.entry"] = {
+        "version": 1,
+        "key": "mass.library_index.entry",
+        "data": StoredLibraryIndex(server_id="1", built_at=0, **data.to_columns()),
+    }
+    connection = MagicMock()
+    mass = connection.client
+    mass.server_info.server_id = "1"
+    for media_type in ("playlists", "tracks", "albums", "artists"):
+        setattr(mass.music, f"get_library_{media_type}", AsyncMock(return_value=[]))
+    mass.music.get_library_radios = AsyncMock(
+        return_value=[
+            MagicMock(
+                uri=f"library://radio/{idx}",
+                media_type=MediaType.RADIO,
+                sort_name=None,
+                artists=[],
+            )
+            for idx in (1, 3)
+        ]
+    )
+    # MagicMock reserves the name argument
+    items = mass.music.get_library_radios.return_value
+    items[0].name = "BBC Radio 4 Extra"
+    items[1].name = "Radio 10"
+    index = LibraryIndex(hass, "entry", connection)
+
+    await index.async_build()
+    assert index.ready
+    assert index.resolve("radio 538") is None
+    assert index.resolve("bbc radio 4 extra") == "library://radio/1"
+    assert index.resolve("radio 10") == "library://radio/3"
+    assert len(index.data) == 2
+    # the saved index was updated, not rebuilt
+    assert len(index.data.removed) == 2
+    index._unsub_save()
@@ -0,0 +1,169 @@
+"""Tests for the Music Assistant media caches."""
+
+import asyncio
+import gc
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import jwt
+import pytest
+
+from music_assistant_models.enums import EventType, MediaType
+from music_assistant_models.errors import MusicAssistantError
+from music_assistant_models.event import MassEvent
+
+from custom_components.mass.media_cache import (
+    LocalFileCache,
+    MediaNameCache,
+    MediaSourceCache,
+    SearchCache,
+)
+
+
+def _item(uri: str) -> MagicMock:
+    """Return a (mocked) media item."""
+    item = MagicMock()
+    item.uri = uri
+    return item
+
+
+async def test_name_cache():
+    """Test items are cached by normalized name and invalidated by events."""
+    connection = MagicMock()
+    mass = connection.client
+    mass.music.get_item_by_name = AsyncMock(return_value=_item("library://radio/1"))
+    cache = MediaNameCache(connection, max_size=2)
+
+    item = await cache.async_get_item_by_name(
+        "BBC  Radio 4", media_type=MediaType.RADIO
+    )
+    assert (
+        await cache.async_get_item_by_name("bbc radio 4", media_type=MediaType.RADIO)
+        is item
+    )
+    assert mass.music.get_item_by_name.call_count == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # updated item is dropped from the cache
+    cache._on_media_item_event(
+        MassEvent(EventType.MEDIA_ITEM_UPDATED, "library://radio/1", None)
+    )
+    await cache.async_get_item_by_name("BBC Radio 4", media_type=MediaType.RADIO)
+    assert mass.music.get_item_by_name.call_count == 2
+
+    # a new item with the same name may be the better match
+    cache._on_media_item_event(
+        MassEvent(
+            EventType.MEDIA_ITEM_ADDED, "library://radio/2", {"name": "BBC Radio 4"}
+        )
+    )
+    await cache.async_get_item_by_name("BBC Radio 4", media_type=MediaType.RADIO)
+    assert mass.music.get_item_by_name.call_count == 3
+
+    # least recently used entry is evicted
+    await cache.async_get_item_by_name("Jazz")
+    await cache.async_get_item_by_name("Rock")
+    await cache.async_get_item_by_name("BBC Radio 4", media_type=MediaType.RADIO)
+    assert mass.music.get_item_by_name.call_count == 6
+
+
+async def test_local_file_cache(hass, tmp_path):
+    """Test local files are checked at once and cached."""
+    local_file = tmp_path / "doorbell.mp3"
+    local_file.write_bytes(b"")
+    missing = str(tmp_path / "missing.mp3")
+    cache = LocalFileCache(hass)
+
+    assert await cache.async_is_file([str(local_file), missing]) == {
+        str(local_file): True,
+        missing: False,
+    }
+    local_file.unlink()
+    # still cached
+    assert await cache.async_is_file([str(local_file)]) == {str(local_file): True}
+
+
+async def test_media_source_cache():
+    """Test resolved media source urls are cached until their signature expires."""
+    cache = MediaSourceCache()
+    media_id = "media-source://media_source/local/doorbell.mp3"
+    cache.set(media_id, "media_player.kitchen", "http://hass/local/doorbell.mp3")
+    assert (
+        cache.get(media_id, "media_player.kitchen") == "http://hass/local/doorbell.mp3"
+    )
+    assert cache.get(media_id, "media_player.living") is None
+
+    # signed urls are only cached until shortly before they expire
+    for expires_in, cached in ((30, False), (3600, True)):
+        signature = jwt.encode({"exp": int(time.time()) + expires_in}, "secret")
+        url = f"http://hass/media/local/doorbell.mp3?authSig={signature}"
+        cache.set(media_id, "media_player.living", url)
+        assert (cache.get(media_id, "media_player.living") == url) is cached
+
+
+async def test_search_cache(hass):
+    """Test identical searches are shared, cached and invalidated."""
+    connection = MagicMock()
+    mass = connection.client
+    release = asyncio.Event()
+
+    async def search(**kwargs) -> MagicMock:
+        await release.wait()
+        return MagicMock()
+
+    mass.music.search = AsyncMock(side_effect=search)
+    cache = SearchCache(hass, connection)
+
+    searches = [
+        asyncio.create_task(
+            cache.async_search("Queen", [MediaType.TRACK, MediaType.ALBUM], 5, False)
+        ),
+        asyncio.create_task(
+            cache.async_search("Queen", [MediaType.ALBUM, MediaType.TRACK], 5, False)
+        ),
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    first, second = await asyncio.gather(*searches)
+    assert first is second
+    assert await cache.async_search("Queen", [MediaType.TRACK], 5, False) is not first
+    assert await cache.async_search("Queen", [MediaType.TRACK], 5, False)
+    assert mass.music.search.call_count == 2
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    cache._on_library_event(
+        MassEvent(EventType.MEDIA_ITEM_ADDED, "library://track/1", None)
+    )
+    await cache.async_search("Queen", [MediaType.TRACK], 5, False)
+    assert mass.music.search.call_count == 3
+
+    # updates (e.g. play counts) do not invalidate the results
+    cache.async_start()
+    assert connection.subscribe.call_args.args[1] == (
+        EventType.MEDIA_ITEM_ADDED,
+        EventType.MEDIA_ITEM_DELETED,
+    )
+
+
+async def test_search_cache_callers_gone(hass, caplog: pytest.LogCaptureFixture):
+    """Test a failed search is handled when all its callers are gone."""
+    connection = MagicMock()
+    release = asyncio.Event()
+
+    async def search(**kwargs) -> MagicMock:
+        await release.wait()
+        raise MusicAssistantError("Search failed")
+
+    connection.client.music.search = AsyncMock(side_effect=search)
+    cache = SearchCache(hass, connection)
+
+    caller = asyncio.create_task(
+        cache.async_search("Queen", [MediaType.TRACK], 5, False)
+    )
+    await asyncio.sleep(0)
+    caller.cancel()
+    release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert not cache.as_dict()["in_flight"]
+    gc.collect()
+    assert "exception was never retrieved" not in caplog.text
@@ -0,0 +1,295 @@
+"""Tests for the Music Assistant media player."""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.components.media_player import MediaPlayerState
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.dt import utcnow
+from music_assistant_models.enums import EventType, PlayerFeature
+from music_assistant_models.enums import PlayerState as MassPlayerState
+from music_assistant_models.errors import MediaNotFoundError, MusicAssistantError
+from music_assistant_models.event import MassEvent
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.mass import media_player
+from custom_components.mass.const import DOMAIN
+from custom_components.mass.media_player import (
+    OPTIMISTIC_STATE_TIMEOUT,
+    PLAY_MEDIA_RESOLVE_CONCURRENCY,
+    MusicAssistantPlayer,
+)
+
+PLAYER_UPDATED = MassEvent(EventType.PLAYER_UPDATED, "kitchen", None)
+
+
+type EntityFactory = Callable[..., Awaitable[MusicAssistantPlayer]]
+
+
+@pytest.fixture
+async def create_entity(hass) -> AsyncIterator[EntityFactory]:
+    """Return a factory of media player entities of (mocked) playing players."""
+    entities: list[MusicAssistantPlayer] = []
+
+    async def create(
+        player_id: str = "kitchen", supported_features: set | None = None
+    ) -> MusicAssistantPlayer:
+        connection = MagicMock()
+        player = MagicMock(
+            player_id=player_id,
+            icon="mdi-speaker",
+            supported_features=supported_features or set(),
+            powered=True,
+            state=MassPlayerState.PLAYING,
+            volume_level=50,
+            volume_muted=False,
+            group_childs=[],
+            active_source=None,
+            current_media=None,
+        )
+        connection.client.players.get.return_value = player
+        entity = MusicAssistantPlayer(connection, player_id)
+        entity.hass = hass
+        entity.entity_id = f"media_player.{player_id}"
+        entity.platform = MagicMock()
+        entity.platform.config_entry = MockConfigEntry(domain=DOMAIN)
+        entity.platform.config_entry.runtime_data = entry_data = MagicMock()
+        entry_data.command_channels = {}
+        entry_data.state_write_stats = {}
+        entry_data.bulk_command_semaphore = asyncio.Semaphore(5)
+        entity.async_write_ha_state = MagicMock()
+        await entity.async_added_to_hass()
+        entities.append(entity)
+        return entity
+
+    yield create
+    for entity in entities:
+        entity._call_on_remove_callbacks()
+
+
+@pytest.fixture
+async def entity(create_entity: EntityFactory) -> MusicAssistantPlayer:
+    """Return a media player entity of a (mocked) playing player."""
+    return await create_entity()
+
+
+async def _send_update(entity: MusicAssistantPlayer) -> None:
+    """Send a player update (of the server) to the entity."""
+    await entity.connection.subscribe.call_args.args[0](PLAYER_UPDATED)
+
+
+async def test_optimistic_state_confirmed(hass, entity: MusicAssistantPlayer):
+    """Test an optimistic state is applied right away and confirmed later."""
+    release = asyncio.Event()
+
+    async def pause(player_id: str) -> None:
+        await release.wait()
+
+    entity.mass.players.player_command_pause = pause
+
+    task = asyncio.create_task(entity.async_media_pause())
+    await hass.async_block_till_done()
+    assert entity.state == MediaPlayerState.PAUSED
+    # an (older) update while the command is sent does not override it
+    await entity.async_flush_update()
+    assert entity.state == MediaPlayerState.PAUSED
+
+    release.set()
+    await task
+    entity.player.state = MassPlayerState.PAUSED
+    await _send_update(entity)
+    assert entity.state == MediaPlayerState.PAUSED
+    assert not entity._optimistic_state
+    assert entity._unsub_optimistic_timeout is None
+
+
+async def test_optimistic_state_overridden(entity: MusicAssistantPlayer):
+    """Test the first update after the command wins over the optimistic state."""
+    entity.mass.players.player_command_volume_set = AsyncMock()
+
+    await entity.async_set_volume_level(0.8)
+    assert entity.volume_level == 0.8
+    # the server clamped the volume
+    entity.player.volume_level = 70
+    await _send_update(entity)
+    assert entity.volume_level == 0.7
+    assert not entity._optimistic_state
+
+
+async def test_optimistic_state_rolled_back(entity: MusicAssistantPlayer):
+    """Test the optimistic state is rolled back when the command fails."""
+    entity.mass.players.player_command_pause = AsyncMock(
+        side_effect=MusicAssistantError("Player rejected the command")
+    )
+
+    with pytest.raises(HomeAssistantError, match="rejected"):
+        await entity.async_media_pause()
+    assert entity.state == MediaPlayerState.PLAYING
+    assert not entity._optimistic_state
+
+
+async def test_optimistic_state_timeout(hass, entity: MusicAssistantPlayer):
+    """Test the optimistic state is rolled back without a server update."""
+    entity.mass.players.player_command_volume_mute = AsyncMock()
+
+    await entity.async_mute_volume(True)
+    assert entity.is_volume_muted
+    async_fire_time_changed(
+        hass, utcnow() + timedelta(seconds=OPTIMISTIC_STATE_TIMEOUT + 1)
+    )
+    await hass.async_block_till_done()
+    assert not entity.is_volume_muted
+    assert not entity._optimistic_state
+
+
+def _mock_name_lookups(
+    entity: MusicAssistantPlayer, lookup: Callable[[str], Awaitable[str]]
+) -> None:
+    """Resolve the media ids (names) of play_media with a lookup."""
+    entry_data = entity.entry_data
+    entry_data.local_file_cache.async_is_file = AsyncMock(return_value={})
+    entry_data.library_index = None
+
+    async def get_item_by_name(name: str, **kwargs) -> MagicMock:
+        return MagicMock(uri=await lookup(name))
+
+    entry_data.media_name_cache.async_get_item_by_name = get_item_by_name
+    entity.mass.player_queues.play_media = AsyncMock()
+
+
+async def test_play_media_resolve(entity: MusicAssistantPlayer):
+    """Test the media ids are resolved concurrently, in order, with the missing ones."""
+    running = 0
+    max_running = 0
+
+    async def lookup(name: str) -> str:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        # the later ids resolve first
+        await asyncio.sleep(0.01 / (int(name[-1]) + 1))
+        running -= 1
+        if name.startswith("missing"):
+            raise MediaNotFoundError(name)
+        return f"library://track/{name}"
+
+    _mock_name_lookups(entity, lookup)
+    media_ids = [f"track{idx}" for idx in range(8)]
+    media_ids.insert(2, "missing9")
+
+    response = await entity._async_handle_play_media(media_ids)
+    uris = [f"library://track/track{idx}" for idx in range(8)]
+    assert response == {"media": uris, "unresolved": ["missing9"]}
+    assert entity.mass.player_queues.play_media.call_args.kwargs["media"] == uris
+    assert max_running == PLAY_MEDIA_RESOLVE_CONCURRENCY
+
+
+async def test_play_media_resolve_deadline(
+    entity: MusicAssistantPlayer, monkeypatch: pytest.MonkeyPatch
+):
+    """Test a lookup that misses the deadline is reported as unresolved."""
+    monkeypatch.setattr(media_player, "PLAY_MEDIA_RESOLVE_TIMEOUT", 0.05)
+
+    async def lookup(name: str) -> str:
+        if name == "slow":
+            await asyncio.sleep(10)
+        return f"library://track/{name}"
+
+    _mock_name_lookups(entity, lookup)
+    response = await entity._async_handle_play_media(["slow", "fast"])
+    assert response == {"media": ["library://track/fast"], "unresolved": ["slow"]}
+
+
+async def test_play_media_resolve_error(entity: MusicAssistantPlayer):
+    """Test an error other than not found fails the call."""
+
+    async def lookup(name: str) -> str:
+        if name == "offline":
+            raise MusicAssistantError("Connection lost")
+        return f"library://track/{name}"
+
+    _mock_name_lookups(entity, lookup)
+    with pytest.raises(HomeAssistantError, match="Connection lost"):
+        await entity._async_handle_play_media(["track", "offline"])
+    entity.mass.player_queues.play_media.assert_not_called()
+
+
+async def test_bulk_player_command(create_entity: EntityFactory):
+    """Test the result of every player is reported, a failure does not abort."""
+    entities = [
+        await create_entity("kitchen", {PlayerFeature.VOLUME_SET}),
+        await create_entity("garden"),
+        await create_entity("attic", {PlayerFeature.VOLUME_SET}),
+    ]
+    entities[0].mass.players.player_command_volume_set = AsyncMock()
+    entities[2].mass.players.player_command_volume_set = AsyncMock(
+        side_effect=MusicAssistantError("Player is offline")
+    )
+
+    results = await asyncio.gather(
+        *(
+            entity._async_handle_bulk_player_command("volume_set", volume_level=0.3)
+            for entity in entities
+        )
+    )
+    assert results == [
+        {"success": True},
+        {"success": False, "error": "volume_set is not supported"},
+        {"success": False, "error": "Player is offline"},
+    ]
+    entities[0].mass.players.player_command_volume_set.assert_awaited_once_with(
+        "kitchen", 30
+    )
+    entities[1].mass.players.player_command_volume_set.assert_not_called()
+
+
+async def test_updates_coalesced(hass, entity: MusicAssistantPlayer):
+    """Test a burst of updates results in a single state write."""
+    entity.async_write_ha_state.reset_mock()
+    for volume_level in (10, 20, 30):
+        entity.player.volume_level = volume_level
+        await _send_update(entity)
+    entity.async_write_ha_state.assert_not_called()
+
+    async_fire_time_changed(hass, utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    entity.async_write_ha_state.assert_called_once()
+    assert entity.volume_level == 0.3
+
+
+async def test_update_flushed_after_command(entity: MusicAssistantPlayer):
+    """Test the first update after a command is written right away."""
+    entity.mass.players.player_command_next_track = AsyncMock()
+    await entity.async_media_next_track()
+    entity.async_write_ha_state.reset_mock()
+
+    entity.player.volume_level = 10
+    await _send_update(entity)
+    entity.async_write_ha_state.assert_called_once()
+    # later updates are coalesced again
+    entity.player.volume_level = 20
+    await _send_update(entity)
+    entity.async_write_ha_state.assert_called_once()
+
+
+async def test_unchanged_state_not_written(hass, entity: MusicAssistantPlayer):
+    """Test an update that does not change the derived state is not written."""
+    entity.async_write_ha_state.reset_mock()
+    # e.g. an attribute that is not rendered changed
+    entity.player.display_name = "Kitchen speaker"
+    await _send_update(entity)
+    async_fire_time_changed(hass, utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    entity.async_write_ha_state.assert_not_called()
+    assert entity._write_stats.suppressed == 1
+
+    entity.player.volume_muted = True
+    await entity.async_flush_update()
+    entity.async_write_ha_state.assert_called_once()
+    assert entity._write_stats.written == 1
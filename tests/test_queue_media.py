@@ -0,0 +1,96 @@
+"""Tests for the Music Assistant queue media projection."""
+
+from unittest.mock import MagicMock
+
+from music_assistant_models.enums import EventType, MediaType
+from music_assistant_models.event import MassEvent
+from music_assistant_models.player_queue import PlayerQueue
+from music_assistant_models.queue_item import QueueItem
+
+from custom_components.mass.queue_media import (
+    QueueMediaAttributesCache,
+    compact_queue_item,
+)
+
+
+def _queue(name: str) -> PlayerQueue:
+    """Return a queue playing an item (with the same id) of a name."""
+    return PlayerQueue(
+        queue_id="kitchen",
+        active=True,
+        display_name="Kitchen",
+        available=True,
+        items=1,
+        current_item=QueueItem(
+            queue_id="kitchen", queue_item_id="abc", name=name, duration=None
+        ),
+    )
+
+
+def test_queue_media_cache():
+    """Test the attributes follow in place updates and removed queues."""
+    connection = MagicMock()
+    mass = connection.client
+    mass.get_media_item_image_url.return_value = None
+    cache = QueueMediaAttributesCache(connection)
+
+    queue = _queue("Radio 1")
+    attributes = cache.get(queue)
+    assert attributes is not None
+    assert attributes.media_title == "Radio 1"
+    assert cache.get(queue) is attributes
+
+    # the same queue item updated in place
+    attributes = cache.get(_queue("Radio 1 - News"))
+    assert attributes is not None
+    assert attributes.media_title == "Radio 1 - News"
+
+    cache._on_player_removed(MassEvent(EventType.PLAYER_REMOVED, "kitchen", None))
+    assert not cache._cache
+
+
+def test_compact_queue_item():
+    """Test a queue item is projected to its compact dict."""
+    mass = MagicMock()
+    mass.get_media_item_image_url.return_value = None
+    item = QueueItem.from_dict(
+        {
+            "queue_id": "kitchen",
+            "queue_item_id": "abc",
+            "name": "Queen - We Will Rock You",
+            "duration": 122,
+            "media_item": {
+                "item_id": "1",
+                "provider": "library",
+                "name": "We Will Rock You",
+                "uri": "library://track/1",
+                "media_type": "track",
+                "provider_mappings": [],
+                "artists": [
+                    {
+                        "item_id": "1",
+                        "provider": "library",
+                        "name": "Queen",
+                        "media_type": "artist",
+                    }
+                ],
+                "album": {
+                    "item_id": "1",
+                    "provider": "library",
+                    "name": "News of the World",
+                    "media_type": "album",
+                },
+            },
+        }
+    )
+    assert compact_queue_item(mass, item, 12) == {
+        "queue_item_id": "abc",
+        "index": 12,
+        "name": "Queen - We Will Rock You",
+        "duration": 122,
+        "uri": "library://track/1",
+        "media_type": MediaType.TRACK,
+        "artist": "Queen",
+        "album": "News of the World",
+        "image": None,
+    }
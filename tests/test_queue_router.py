@@ -0,0 +1,84 @@
+"""Tests for the Music Assistant queue event router."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+from music_assistant_models.enums import EventType, PlayerState
+from music_assistant_models.event import MassEvent
+from music_assistant_models.player_queue import PlayerQueue
+
+from custom_components.mass.queue_router import QueueEventRouter
+
+
+def _queue_event(queue_id: str) -> MassEvent:
+    """Return a QUEUE_UPDATED event for the given queue."""
+    return MassEvent(event=EventType.QUEUE_UPDATED, object_id=queue_id, data=None)
+
+
+async def test_router_only_notifies_subscribers_of_queue():
+    """Test an event only reaches the subscribers of that queue."""
+    router = QueueEventRouter(MagicMock())
+    kitchen = AsyncMock()
+    living = AsyncMock()
+    router.async_subscribe(kitchen, ["kitchen", "downstairs"])
+    router.async_subscribe(living, ["living", "downstairs"])
+
+    await router._on_queue_updated(_queue_event("kitchen"))
+    assert kitchen.call_count == 1
+    assert living.call_count == 0
+
+    await router._on_queue_updated(_queue_event("downstairs"))
+    assert kitchen.call_count == 2
+    assert living.call_count == 1
+
+
+async def test_router_unsubscribe():
+    """Test unsubscribing removes the subscriber from the index."""
+    router = QueueEventRouter(MagicMock())
+    kitchen = AsyncMock()
+    unsub = router.async_subscribe(kitchen, ["kitchen"])
+    unsub()
+
+    await router._on_queue_updated(_queue_event("kitchen"))
+    assert kitchen.call_count == 0
+    assert not router._subscribers[EventType.QUEUE_UPDATED]
+
+
+async def test_router_time_updates_only_forward_jumps():
+    """Test steady playback is not forwarded but a seek is."""
+    queue = PlayerQueue(
+        queue_id="kitchen",
+        active=True,
+        display_name="Kitchen",
+        available=True,
+        items=1,
+        elapsed_time=100,
+        elapsed_time_last_updated=time.time(),
+        state=PlayerState.PLAYING,
+    )
+    connection = MagicMock()
+    mass = connection.client
+    mass.player_queues.get.return_value = queue
+    router = QueueEventRouter(connection)
+    kitchen = AsyncMock()
+    router.async_subscribe(kitchen, ["kitchen"], EventType.QUEUE_TIME_UPDATED)
+
+    event = MassEvent(event=EventType.QUEUE_TIME_UPDATED, object_id="kitchen", data=101)
+    await router._on_queue_time_updated(event)
+    assert kitchen.call_count == 0
+
+    event = MassEvent(event=EventType.QUEUE_TIME_UPDATED, object_id="kitchen", data=200)
+    await router._on_queue_time_updated(event)
+    assert kitchen.call_count == 1
+    # the position is kept by the router, not written into the queue model
+    assert router.async_get_position(queue).elapsed_time == 200
+    assert queue.elapsed_time == 100
+
+    # steady playback from the new position is not forwarded
+    event = MassEvent(event=EventType.QUEUE_TIME_UPDATED, object_id="kitchen", data=201)
+    await router._on_queue_time_updated(event)
+    assert kitchen.call_count == 1
+
+    # the queue holds the latest position again after a QUEUE_UPDATED
+    await router._on_queue_updated(_queue_event("kitchen"))
+    assert router.async_get_position(queue).elapsed_time == 100